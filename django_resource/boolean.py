@@ -1,4 +1,7 @@
-from tt import BooleanExpression
+import re
+from collections import deque
+from functools import lru_cache
+
 from .exceptions import ExpressionValidationError
 
 NOT = 'not'
@@ -9,8 +12,191 @@ BINARY_OPERATORS = {AND, OR}
 BOOLEAN_OPERATORS = UNARY_OPERATORS | BINARY_OPERATORS
 SIMPLE_EXPRESSIONS = {AND, OR}
 
+# operator spellings -> operator
+OPERATORS = {
+    'not': NOT,
+    '~': NOT,
+    '!': NOT,
+    'and': AND,
+    '&': AND,
+    '&&': AND,
+    'or': OR,
+    '|': OR,
+    '||': OR,
+    ',': OR,
+}
+# binding strength of each operator, higher binds tighter
+PRECEDENCE = {OR: 1, AND: 2, NOT: 3}
+TOKEN_REGEX = re.compile(r'\s*(?:(&&|\|\||[&|,~!()])|([A-Za-z0-9_.-]+))')
+# number of distinct expressions kept parsed
+CACHE_SIZE = 1024
+# nesting limit when none is configured
+MAX_DEPTH = 32
+
+
+def tokenize(expression):
+    """Split an expression into operator, parenthesis and symbol tokens
+
+    Returns:
+        list of (kind, value) pairs, where kind is "op", "(", ")" or "symbol"
+    """
+    tokens = []
+    position = 0
+    end = len(expression.rstrip())
+    while position < end:
+        match = TOKEN_REGEX.match(expression, position)
+        if not match:
+            raise ExpressionValidationError(
+                f'Invalid expression "{expression}" at position {position}'
+            )
+        position = match.end()
+        punctuation, word = match.groups()
+        value = punctuation or word
+        operator = OPERATORS.get(value.lower())
+        if operator:
+            tokens.append(('op', operator))
+        elif value in {'(', ')'}:
+            tokens.append((value, value))
+        else:
+            tokens.append(('symbol', value))
+    return tokens
+
+
+def is_chain(node, operator):
+    """Whether a node is an open chain of a binary operator"""
+    return isinstance(node, tuple) and node[0] == operator and isinstance(
+        node[1], deque
+    )
+
+
+def freeze(node):
+    """Close an open chain: its children become a tuple"""
+    if isinstance(node, tuple) and isinstance(node[1], deque):
+        return node[0], tuple(node[1])
+    return node
+
+
+def make_node(operator, operands):
+    """Make a tree node, flattening chains of the same binary operator
+
+    Binary nodes keep their children in a deque until they become the
+    operand of another operator, so extending a chain does not copy it.
+
+    Returns:
+        (node, depth)
+    """
+    if operator == NOT:
+        node, depth = operands[0]
+        return (NOT, (freeze(node),)), depth + 1
+
+    (left, left_depth), (right, right_depth) = operands
+    left_chain = is_chain(left, operator)
+    right_chain = is_chain(right, operator)
+    # (a and b) and c -> and(a, b, c), one level less deep
+    depth = max(left_depth - left_chain, right_depth - right_chain) + 1
+    if left_chain and right_chain:
+        # move the shorter chain into the longer one
+        if len(left[1]) >= len(right[1]):
+            left[1].extend(right[1])
+            return left, depth
+        right[1].extendleft(reversed(left[1]))
+        return right, depth
+    if left_chain:
+        left[1].append(freeze(right))
+        return left, depth
+    if right_chain:
+        right[1].appendleft(freeze(left))
+        return right, depth
+    return (operator, deque((freeze(left), freeze(right)))), depth
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_expression(expression):
+    """Parse a boolean expression
+
+    Uses operator precedence (shunting-yard) parsing without recursion:
+    not binds tighter than and, which binds tighter than or. Chains of
+    one operator are extended in place, so "a and b and c ..." is parsed
+    in linear time.
 
-def build_expression(expression, mapping):
+    Returns:
+        (tree, depth, symbols) where tree is a symbol or an
+        (operator, operands) tuple, and depth is the operator nesting depth
+    """
+    tokens = tokenize(expression)
+    if not tokens:
+        raise ExpressionValidationError('Empty expression')
+
+    operands = []  # (node, depth)
+    operators = []
+    symbols = set()
+
+    def reduce():
+        operator = operators.pop()
+        arity = 1 if operator == NOT else 2
+        if len(operands) < arity:
+            raise ExpressionValidationError(
+                f'Invalid expression "{expression}", missing operand'
+            )
+        args = operands[-arity:]
+        del operands[-arity:]
+        operands.append(make_node(operator, args))
+
+    expect_operand = True
+    for kind, value in tokens:
+        if expect_operand:
+            if kind == 'symbol':
+                symbols.add(value)
+                operands.append((value, 0))
+                expect_operand = False
+            elif kind == '(':
+                operators.append(value)
+            elif kind == 'op' and value == NOT:
+                operators.append(value)
+            else:
+                raise ExpressionValidationError(
+                    f'Invalid expression "{expression}", unexpected "{value}"'
+                )
+        else:
+            if kind == ')':
+                while operators and operators[-1] != '(':
+                    reduce()
+                if not operators:
+                    raise ExpressionValidationError(
+                        f'Invalid expression "{expression}", unbalanced ")"'
+                    )
+                operators.pop()
+            elif kind == 'op' and value in BINARY_OPERATORS:
+                precedence = PRECEDENCE[value]
+                while (
+                    operators
+                    and operators[-1] != '('
+                    and PRECEDENCE[operators[-1]] >= precedence
+                ):
+                    reduce()
+                operators.append(value)
+                expect_operand = True
+            else:
+                raise ExpressionValidationError(
+                    f'Invalid expression "{expression}", unexpected "{value}"'
+                )
+
+    if expect_operand:
+        raise ExpressionValidationError(
+            f'Invalid expression "{expression}", missing operand'
+        )
+    while operators:
+        if operators[-1] == '(':
+            raise ExpressionValidationError(
+                f'Invalid expression "{expression}", unbalanced "("'
+            )
+        reduce()
+
+    tree, depth = operands[0]
+    return freeze(tree), depth, frozenset(symbols)
+
+
+def build_expression(expression, mapping, max_depth=None):
     """Build a nested dict encoding of a boolean expression
 
     Arguments:
@@ -18,54 +204,35 @@ def build_expression(expression, mapping):
             example: a and b or c
         mapping: should resolve all symbols in expression
             example: {"a": 1, "b": 2, "c": 3}
+        max_depth: maximum operator nesting depth, defaults to MAX_DEPTH
     Returns:
         example:
-            {"or": [3, {"and": [1, 2]}]}
+            {"or": [{"and": [1, 2]}, 3]}
     """
-    expression = BooleanExpression(expression)
-    symbols = expression.symbols
-    undefined = set(symbols) - mapping.keys()
+    tree, depth, symbols = parse_expression(expression)
+    if max_depth is None:
+        max_depth = MAX_DEPTH
+    if depth > max_depth:
+        raise ExpressionValidationError(
+            f'Expression "{expression}" is nested {depth} levels deep, '
+            f'the maximum is {max_depth}'
+        )
+    undefined = symbols - mapping.keys()
     if undefined:
-        undefined = ', '.join(undefined)
+        undefined = ', '.join(sorted(undefined))
         raise ExpressionValidationError(
             f'Undefined values in expression: {undefined}'
         )
-    return _build_expression(expression, mapping)
-
-
-def _build_expression(expression, mapping):
-    if isinstance(expression, BooleanExpression):
-        tree = expression.tree
-    else:
-        tree = expression
-
-    symbol = tree.symbol_name
-    if not (tree.is_dnf or tree.is_cnf):
-        tree = tree.to_cnf()
-
-    operator = getattr(tree, 'operator', None)
-    if operator:
-        key = symbol
-        if symbol in UNARY_OPERATORS:
-            return {
-                key: _build_expression(tree.l_child, mapping)
-            }
-
-        clauses = dnf = cnf = None
-        if tree.is_dnf:
-            clauses = dnf = list(tree.iter_dnf_clauses())
-        if tree.is_cnf:
-            clauses = cnf = list(tree.iter_cnf_clauses())
-        if tree.is_dnf and tree.is_cnf:
-            if len(dnf) > len(cnf):
-                # go for longer chain
-                clauses = dnf
-            else:
-                clauses = cnf
-        return {
-            key: [
-                _build_expression(operand, mapping) for operand in clauses
-            ]
-        }
-    else:
-        return mapping[symbol]
+    return _build_expression(tree, mapping)
+
+
+def _build_expression(tree, mapping):
+    if not isinstance(tree, tuple):
+        return mapping[tree]
+
+    operator, operands = tree
+    if operator in UNARY_OPERATORS:
+        return {operator: _build_expression(operands[0], mapping)}
+    return {
+        operator: [_build_expression(operand, mapping) for operand in operands]
+    }
@@ -0,0 +1,268 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from urllib.parse import quote
+
+
+class LRUCache(object):
+    """Bounded, thread-safe least-recently-used cache
+
+    Tracks hits and misses for monitoring.
+
+    Arguments:
+        size: maximum number of entries, None for no limit
+        ttl: seconds an entry stays valid, None for no expiry
+    """
+
+    def __init__(self, size, ttl=None):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (value, expires)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.size is not None and self.size <= 0:
+            return
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            if self.size is not None:
+                while len(self._data) > self.size:
+                    self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, test):
+        """Delete all entries with keys that pass test"""
+        with self._lock:
+            for key in [key for key in self._data if test(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self.size,
+            "ttl": self.ttl,
+            "count": len(self._data),
+        }
+
+
+class RecordCache(object):
+    """Interface for caches of resolved records, keyed by resource and key
+
+    Each Space has its own record cache, which is given the space name
+    as namespace. Backends are configured by the RECORD_CACHE setting.
+    """
+
+    def __init__(self, namespace=None):
+        self.namespace = namespace
+
+    def get(self, name, key, default=None):
+        return self.get_many(name, [key]).get(key, default)
+
+    def get_many(self, name, keys):
+        """Get cached records
+
+        Returns:
+            dict of key -> record, uncached keys are left out
+        """
+        raise NotImplementedError()
+
+    def set(self, name, key, record):
+        self.set_many(name, {key: record})
+
+    def set_many(self, name, records):
+        """Cache a dict of key -> record"""
+        raise NotImplementedError()
+
+    def invalidate(self, name=None, key=None):
+        """Drop cached records
+
+        Arguments:
+            name: resource name, None to drop all records
+            key: record key, None to drop all records of the resource
+        """
+        raise NotImplementedError()
+
+
+class LocalRecordCache(RecordCache):
+    """In-process record cache with LRU eviction and optional expiry
+
+    Arguments:
+        namespace: space name
+        size: maximum number of records, None for no limit
+        ttl: seconds a record stays cached, None for no expiry
+    """
+
+    def __init__(self, namespace=None, size=10000, ttl=None):
+        super(LocalRecordCache, self).__init__(namespace=namespace)
+        self.cache = LRUCache(size, ttl=ttl)
+
+    def get(self, name, key, default=None):
+        return self.cache.get((name, key), default)
+
+    def get_many(self, name, keys):
+        records = {}
+        missing = object()
+        for key in keys:
+            record = self.cache.get((name, key), missing)
+            if record is not missing:
+                records[key] = record
+        return records
+
+    def set(self, name, key, record):
+        self.cache.set((name, key), record)
+
+    def set_many(self, name, records):
+        for key, record in records.items():
+            self.cache.set((name, key), record)
+
+    def invalidate(self, name=None, key=None):
+        if name is None:
+            self.cache.clear()
+        elif key is None:
+            self.cache.delete_matching(lambda k: k[0] == name)
+        else:
+            self.cache.delete((name, key))
+
+    def info(self):
+        return self.cache.info()
+
+
+class DjangoRecordCache(RecordCache):
+    """Record cache backed by the Django cache framework
+
+    Can be shared between processes, records must be picklable.
+    The namespace and each resource have a version number stored in the
+    cache; invalidating bumps the resource's version, or the namespace's
+    to drop all records, so that old entries are never read again
+    and expire on their own.
+
+    Arguments:
+        namespace: space name
+        alias: name of the cache in CACHES
+        timeout: seconds a record stays cached, None to use the cache default
+        prefix: prepended to all cache keys
+    """
+
+    def __init__(
+        self,
+        namespace=None,
+        alias='default',
+        timeout=None,
+        prefix='django_resource.records'
+    ):
+        super(DjangoRecordCache, self).__init__(namespace=namespace)
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+
+        return caches[self.alias]
+
+    def get_timeout(self):
+        if self.timeout is None:
+            # use the cache's own default
+            from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+            return DEFAULT_TIMEOUT
+        return self.timeout
+
+    def get_version_key(self, name=None):
+        """Get the cache key of a resource's version, or the namespace's"""
+        if name is None:
+            return quote(f'{self.prefix}:{self.namespace}:version')
+        return quote(f'{self.prefix}:{self.namespace}:{name}:version')
+
+    def get_version(self, name):
+        """Get the version of a resource's records
+
+        Returns:
+            "{namespace version}.{resource version}"
+        """
+        keys = [self.get_version_key(), self.get_version_key(name)]
+        found = self.cache.get_many(keys)
+        versions = []
+        for key in keys:
+            version = found.get(key)
+            if version is None:
+                version = 1
+                # never expire versions, otherwise stale entries could resurface
+                self.cache.add(key, version, None)
+            versions.append(str(version))
+        return '.'.join(versions)
+
+    def get_key(self, name, key, version):
+        return quote(f'{self.prefix}:{self.namespace}:{name}:{version}:{key}')
+
+    def get_many(self, name, keys):
+        version = self.get_version(name)
+        cache_keys = {self.get_key(name, key, version): key for key in keys}
+        found = self.cache.get_many(list(cache_keys.keys()))
+        return {cache_keys[k]: record for k, record in found.items()}
+
+    def set_many(self, name, records):
+        version = self.get_version(name)
+        self.cache.set_many(
+            {
+                self.get_key(name, key, version): record
+                for key, record in records.items()
+            },
+            self.get_timeout()
+        )
+
+    def invalidate(self, name=None, key=None):
+        if key is None:
+            try:
+                self.cache.incr(self.get_version_key(name))
+            except ValueError:
+                # no version yet, so nothing is cached
+                pass
+        else:
+            self.cache.delete(self.get_key(name, key, self.get_version(name)))
+
+
+def get_record_cache(namespace=None):
+    """Make the record cache configured by the RECORD_CACHE setting"""
+    from django.utils.module_loading import import_string
+
+    from .conf import get_setting
+
+    config = get_setting('RECORD_CACHE')
+    backend = import_string(config['BACKEND'])
+    return backend(namespace=namespace, **config.get('OPTIONS', {}))
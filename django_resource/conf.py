@@ -0,0 +1,26 @@
+from django.conf import settings
+
+DEFAULTS = {
+    # maximum number of parsed querystrings kept by Query.from_querystring
+    # set to 0 to disable the cache
+    "QUERY_CACHE_SIZE": 1024,
+    # cache of records resolved by each space through links
+    # BACKEND is an import path to a RecordCache class, OPTIONS its arguments
+    # use "django_resource.cache.DjangoRecordCache" to share records
+    # through the Django cache framework
+    "RECORD_CACHE": {
+        "BACKEND": "django_resource.cache.LocalRecordCache",
+        "OPTIONS": {"size": 10000, "ttl": None},
+    },
+    # import path of the Server, used by the resource_snapshot command
+    "SERVER": None,
+    # path of a schema snapshot written by the resource_snapshot command,
+    # loaded with the router if it matches the current code
+    "SNAPSHOT": None,
+}
+
+
+def get_setting(name):
+    """Get a setting from DJANGO_RESOURCE, falling back to DEFAULTS"""
+    options = getattr(settings, "DJANGO_RESOURCE", None) or {}
+    return options.get(name, DEFAULTS[name])
@@ -0,0 +1,109 @@
+import datetime
+import json
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .exceptions import QueryValidationError
+
+SALT = 'django_resource.cursor'
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps the microseconds that DjangoJSONEncoder leaves out
+
+    Sort keys must be exact, or records with close timestamps
+    would be repeated or skipped across pages.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorSerializer(object):
+    """Signing serializer that supports dates, decimals and UUIDs"""
+
+    def dumps(self, obj):
+        return json.dumps(
+            obj, separators=(',', ':'), cls=CursorEncoder
+        ).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def encode_cursor(order, values):
+    """Encode the last sort key tuple of a page as an opaque, signed string
+
+    Arguments:
+        order: list of (lookup, descending) pairs
+        values: sort key values of the last record, one per order pair
+    """
+    payload = {
+        'o': [[lookup, descending] for lookup, descending in order],
+        'k': list(values)
+    }
+    return signing.dumps(
+        payload, salt=SALT, serializer=CursorSerializer, compress=True
+    )
+
+
+def decode_cursor(cursor, order):
+    """Decode a cursor created by encode_cursor
+
+    Raises:
+        QueryValidationError if the cursor is invalid or was created
+        for a different sort order
+    """
+    try:
+        payload = signing.loads(
+            str(cursor), salt=SALT, serializer=CursorSerializer
+        )
+    except signing.BadSignature:
+        raise QueryValidationError(f'Invalid page key "{cursor}"')
+
+    expected = [[lookup, descending] for lookup, descending in order]
+    if payload.get('o') != expected:
+        raise QueryValidationError(
+            f'Invalid page key "{cursor}", sort does not match'
+        )
+    return payload['k']
+
+
+def get_keyset_filter(order, values, nullable=()):
+    """Build a Q that selects the records after values in the given order
+
+    NULLs sort after every other value: last in ascending order and
+    first in descending order (see Level.sort).
+
+    Example:
+        order: [("name", False), ("created", True), ("pk", False)]
+        values: ["Joe", "2020-01-01", 10]
+        filter:
+            name > "Joe"
+            OR (name = "Joe" AND created < "2020-01-01")
+            OR (name = "Joe" AND created = "2020-01-01" AND pk > 10)
+
+    Arguments:
+        nullable: lookups that can be NULL
+    """
+    result = Q()
+    equal = Q()
+    for (lookup, descending), value in zip(order, values):
+        if value is None:
+            # descending, every value comes after NULL; ascending, none does
+            after = Q(**{f'{lookup}__isnull': False}) if descending else None
+            same = Q(**{f'{lookup}__isnull': True})
+        else:
+            operator = 'lt' if descending else 'gt'
+            after = Q(**{f'{lookup}__{operator}': value})
+            if lookup in nullable and not descending:
+                after |= Q(**{f'{lookup}__isnull': True})
+            same = Q(**{lookup: value})
+        if after is not None:
+            result |= equal & after
+        equal &= same
+    return result
@@ -13,6 +13,11 @@ class QueryExecutionError(Exception):
     pass
 
 
+class RecordNotFoundError(Exception):
+    """Exception resolving a link to a record that does not exist"""
+    pass
+
+
 class ExpressionValidationError(QueryValidationError):
     """Exception validating a query expression"""
     pass
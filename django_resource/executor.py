@@ -0,0 +1,1326 @@
+from collections import OrderedDict
+
+import django
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, ForeignObjectRel, Model, OuterRef, QuerySet, Subquery
+from django.db.models.manager import BaseManager
+
+from .exceptions import QueryValidationError, QueryExecutionError
+from .cursor import decode_cursor, encode_cursor, get_keyset_filter
+from .expression import execute
+from .record import Record, get_record_type
+from .introspection import get_model_field, get_model_schema, to_lookup
+from .features import TAKE, SORT, PAGE, WHERE, GROUP
+from .group import GROUP_KEY, get_aggregates
+from .prefetch import get_getter_value, plan_prefetch, to_field_value
+from .translate import translate_source
+from .types import get_link, get_links
+from .where import PARENT_REFERENCE, WherePath, compile_where
+
+# annotation used to tie each row of a nested level back to its parent row
+PARENT = '_parent'
+# annotation prefix for the sort keys used to build page cursors
+SORT_KEY = '_sort'
+# annotation prefix for computed fields translated into SQL
+SOURCE_KEY = '_source'
+# separator of resource and key in polymorphic link IDs: "posts/123"
+LINK_SEPARATOR = '/'
+# rows per server-side cursor fetch when streaming
+CHUNK_SIZE = 1000
+DEFAULT_PAGE_MAX = 1000
+
+
+def get_attribute(instance, path):
+    """Get a value by following a dotted attribute path, None-safe
+
+    Paths through a to-many relation ("groups.name") give a list,
+    with one value per related record.
+    """
+    value = instance
+    parts = path.split('.')
+    for i, part in enumerate(parts):
+        if value is None:
+            return None
+        if isinstance(value, BaseManager):
+            rest = '.'.join(parts[i:])
+            return [get_attribute(related, rest) for related in value.all()]
+        value = getattr(value, part, None)
+    return value
+
+
+def is_lazy(spec, method):
+    """Whether a field is left out of "*" for a method
+
+    Arguments:
+        spec: field spec, "lazy" is a boolean or a map of methods,
+            e.g. {"get.resource": True} for list requests only
+        method: "get.resource" or "get.record"
+    """
+    lazy = spec.get('lazy')
+    if isinstance(lazy, dict):
+        value = lazy.get(method)
+        if value is None:
+            value = lazy.get(method.split('.')[0])
+        return bool(value)
+    return bool(lazy)
+
+
+def is_generic(field):
+    """Whether a model field is a generic foreign key"""
+    return hasattr(field, 'ct_field') and hasattr(field, 'fk_field')
+
+
+def get_primary_keys(model, keys):
+    """Convert record keys to a model's primary key type
+
+    Returns:
+        dict of primary key -> key, leaving out keys that are not valid
+        for the primary key: there can be no such records
+    """
+    to_python = model._meta.pk.to_python
+    pks = {}
+    for key in keys:
+        try:
+            pks[to_python(key)] = key
+        except (ValidationError, ValueError, TypeError):
+            continue
+    return pks
+
+
+def merge_record(record, other):
+    """Combine two renderings of the same record, e.g. from different levels"""
+    if record is None:
+        return other
+    if isinstance(record, Record):
+        return Record.merge(record, other)
+    record.update(other)
+    return record
+
+
+class Link(object):
+    """Relation from a level to one of its link fields
+
+    Arguments:
+        name: field name
+        source: dotted path on the parent model
+        model: related model at the end of the path
+        reverse: lookup from the related model back to the parent model
+        many: whether any hop along the path is to-many
+        resource: related resource or None if the model is not exposed
+        value: attribute path holding the related ID (to-one only)
+    """
+
+    def __init__(
+        self, name, source, model, reverse, many, resource=None, value=None
+    ):
+        self.name = name
+        self.source = source
+        self.lookup = to_lookup(source)
+        self.model = model
+        self.reverse = reverse
+        self.many = many
+        self.resource = resource
+        self.value = value
+
+    @classmethod
+    def make(cls, model, name, source):
+        """Walk source across model relations
+
+        Returns:
+            Link, or None if source does not end in a relation
+        """
+        reverse = []
+        many = False
+        field = None
+        parts = source.split('.')
+        for part in parts:
+            if model is None:
+                return None
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if not field.is_relation or field.related_model is None:
+                return None
+            if isinstance(field, ForeignObjectRel):
+                reverse.append(field.field.name)
+            else:
+                reverse.append(field.related_query_name())
+            many = many or field.many_to_many or field.one_to_many
+            model = field.related_model
+
+        value = None
+        if not many:
+            if field.concrete:
+                # read the local column rather than the related object
+                value = '.'.join(parts[:-1] + [field.attname])
+            else:
+                # reverse one-to-one
+                value = f'{source}.pk'
+        return cls(
+            name,
+            source,
+            model,
+            '__'.join(reversed(reverse)),
+            many,
+            value=value
+        )
+
+    @property
+    def select(self):
+        """Path to pass to select_related to read a to-one value"""
+        if self.many:
+            return None
+        parts = self.value.split('.')[:-1]
+        return '__'.join(parts) if parts else None
+
+
+class Level(object):
+    """One node of the query tree
+
+    Each level is fetched with exactly one query. Nested levels are filtered
+    by their parent's query as a subquery: parent_id IN (SELECT ...)
+    """
+
+    def __init__(
+        self, executor, resource, state=None, path=None, parent=None, link=None
+    ):
+        self.executor = executor
+        self.resource = resource
+        self.name = resource.get_option('name') if resource else None
+        self.state = state if isinstance(state, dict) else {}
+        self.path = path or self.name
+        self.parent = parent
+        self.link = link
+        if resource is None:
+            # IDs of a model that is not exposed as a resource
+            self.model = link.model
+            self.fields = {}
+        else:
+            self.model = executor.get_model(resource)
+            self.fields = executor.get_fields(resource, self.model)
+        # to-many levels taken as True render IDs only
+        self.only_ids = parent is not None and not isinstance(state, dict)
+        self.cursor = None
+        self.count = None
+        self.ids = None
+        self.links = {}
+        # computed field name -> database expression or None
+        self.sources = {}
+        # computed fields used in this level's query
+        self.computed = set()
+        # polymorphic link field name -> target resource names
+        self.polymorphic = {}
+        # target resource -> keys of taken polymorphic links, in order
+        self.link_ids = OrderedDict()
+        # model -> resource name, for polymorphic link IDs
+        self.link_names = {}
+        self.take = self.get_take()
+        self.aggregates = self.get_aggregates()
+        # level aggregate values, set when fetched
+        self.group = None
+        # fields rendered in records: to-many links are rendered separately
+        self.columns = tuple(
+            name for name in self.take
+            if name not in self.links or not self.links[name].many
+        ) + tuple(
+            aggregate.name for aggregate in self.aggregates
+            if aggregate.per_record
+        )
+        self.record_type = (
+            get_record_type(self.name, self.columns)
+            if executor.compact else None
+        )
+        self.children = self.get_children()
+
+    def get_take(self):
+        if self.only_ids:
+            return {}
+
+        take = self.state.get(TAKE)
+        if not take:
+            take = {'*': True}
+
+        result = {}
+        if take.get('*'):
+            method = 'get.resource'
+            if self.parent is None and self.state.get('record') is not None:
+                method = 'get.record'
+            for name, spec in self.fields.items():
+                if not is_lazy(spec, method):
+                    result[name] = True
+
+        for name, value in take.items():
+            if name == '*':
+                continue
+            if name not in self.fields:
+                raise QueryValidationError(
+                    f'Invalid take key "{name}" for {self.path}'
+                )
+            if value is False:
+                result.pop(name, None)
+            else:
+                result[name] = value
+
+        for name in result:
+            link = self.get_link(name)
+            if link:
+                self.links[name] = link
+        return result
+
+    def get_aggregates(self):
+        group = self.state.get(GROUP)
+        if not group or self.only_ids:
+            return []
+
+        feature = self.executor.get_feature(GROUP)
+        operators = feature.get('operators') if isinstance(feature, dict) else None
+        aggregates = get_aggregates(group, self, operators=operators)
+        for aggregate in aggregates:
+            if aggregate.per_record and aggregate.name in self.take:
+                raise QueryValidationError(
+                    f'Invalid group "{aggregate.name}" for {self.path}, '
+                    f'already a field'
+                )
+        return aggregates
+
+    def get_link(self, name):
+        spec = self.fields[name]
+        source = spec.get('source')
+        targets = self.get_polymorphic_targets(spec)
+        if targets is not None:
+            self.polymorphic[name] = targets
+            return None
+        if not isinstance(source, str) or spec.get('getter'):
+            # computed values, rendered as IDs
+            return None
+        link = Link.make(self.model, name, source)
+        if not link:
+            if get_link(spec.get('type')):
+                raise QueryExecutionError(
+                    f'Link {self.path}.{name} has no model relation "{source}"'
+                )
+            return None
+
+        link.resource = self.get_link_resource(spec, link)
+        return link
+
+    def get_polymorphic_targets(self, spec):
+        """Get the target resources of a polymorphic link field
+
+        Polymorphic links have several link types, or a generic
+        foreign key as source. Their values are "{resource}/{key}" IDs.
+
+        Returns:
+            list of resource names, empty if the targets are not declared,
+            or None if spec is not a polymorphic link
+        """
+        targets = get_links(spec.get('type'))
+        if len(targets) > 1:
+            return targets
+        source = spec.get('source')
+        if isinstance(source, str) and is_generic(
+            get_model_field(self.model, source)
+        ):
+            return targets
+        return None
+
+    def get_link_resource(self, spec, link):
+        """Get the resource a link points to, or None if not exposed"""
+        target = get_link(spec.get('type'))
+        if target:
+            return self.executor.get_resource(target)
+        return self.executor.get_resource_for(link.model)
+
+    def get_children(self):
+        children = []
+        for name, value in self.take.items():
+            link = self.links.get(name)
+            if not link:
+                continue
+
+            if not link.many and value is True:
+                # to-one IDs are read from the local column
+                continue
+
+            if link.resource is None and isinstance(value, dict):
+                raise QueryValidationError(
+                    f'Cannot take {self.path}.{name}: not a resource'
+                )
+
+            children.append(
+                self.executor.Level(
+                    self.executor,
+                    link.resource,
+                    state=value,
+                    path=f'{self.path}.{name}',
+                    parent=self,
+                    link=link
+                )
+            )
+        return children
+
+    @property
+    def key(self):
+        """Data key for the parent -> children ID mapping of a to-many level"""
+        return f'{self.parent.name}.{self.link.name}'
+
+    def get_base_queryset(self):
+        return self.model._default_manager.all()
+
+    def get_queryset(self):
+        """Filtered and ordered, but not sliced, queryset for this level"""
+        queryset = self.get_base_queryset()
+        if self.parent:
+            parent = self.parent.get_subquery
+            if self.link.many:
+                queryset = queryset.annotate(
+                    **{PARENT: F(self.link.reverse)}
+                ).filter(
+                    **{f'{PARENT}__in': parent('pk')}
+                )
+            else:
+                queryset = queryset.filter(pk__in=parent(self.link.lookup))
+
+        queryset = self.filter(queryset)
+        queryset = self.sort(queryset)
+
+        select = [
+            link.select for link in self.links.values()
+            if link.select and not link.many
+        ]
+        schema = get_model_schema(self.model)
+        for name in self.take:
+            prefix = self.get_source_prefix(name)
+            relation = schema.get(prefix) if prefix else None
+            # to-many paths are prefetched, see get_needs
+            if relation and relation['related_model'] and not relation['many']:
+                select.append(to_lookup(prefix))
+        if select:
+            queryset = queryset.select_related(*select)
+        return queryset
+
+    def get_source_prefix(self, name):
+        """Get the relation path of a dotted field source
+
+        Returns:
+            "a.b" for a source "a.b.c", or None if the field is a link
+            or its source is not a dotted path
+        """
+        source = self.fields[name].get('source')
+        if name in self.links or not isinstance(source, str) or '.' not in source:
+            return None
+        return source.rsplit('.', 1)[0]
+
+    def get_subquery(self, column):
+        queryset = self.paginate(self.get_queryset().values(column))
+        if not self.get_page_size():
+            # ordering is irrelevant inside an unsliced IN (...)
+            queryset = queryset.order_by()
+        return queryset
+
+    def filter(self, queryset):
+        record = self.state.get('record')
+        if record is not None and not self.parent:
+            queryset = queryset.filter(pk=record)
+
+        where = self.state.get(WHERE)
+        if where:
+            feature = self.executor.get_feature(WHERE)
+            operators = feature.get('operators') if isinstance(feature, dict) else None
+            condition = compile_where(where, self, operators=operators)
+            queryset = self.annotate_sources(queryset).filter(condition)
+        return queryset
+
+    def get_where_path(self, path, feature=WHERE):
+        """Resolve a dotted where key into a lookup, following links
+
+        Arguments:
+            feature: feature of the key, for error messages
+
+        Raises:
+            QueryValidationError if path is not a path of fields
+            that can be filtered in the database
+        """
+        fields = self.fields
+        model = self.model
+        parts = path.split('.')
+        lookups = []
+        many = False
+        link = None
+        source = None
+        for i, name in enumerate(parts):
+            spec = fields.get(name)
+            source = spec.get('source') if spec else None
+            if len(parts) == 1 and spec and not isinstance(source, str):
+                lookup = self.get_source_lookup(name)
+                if lookup:
+                    return WherePath(lookup)
+            if not isinstance(source, str):
+                raise QueryValidationError(
+                    f'Invalid {feature} key "{path}" for {self.path}'
+                )
+            lookups.append(to_lookup(source))
+            link = Link.make(model, name, source)
+            # any to-many hop along the source, e.g. "groups.name"
+            schema = get_model_schema(model).get(source)
+            if (schema and schema['many']) or (link is not None and link.many):
+                many = True
+            if i == len(parts) - 1:
+                break
+
+            resource = self.get_link_resource(spec, link) if link else None
+            if resource is None:
+                raise QueryValidationError(
+                    f'Invalid {feature} key "{path}", "{name}" is not a link'
+                )
+            model = link.model
+            fields = self.executor.get_fields(resource, model)
+
+        lookup = '__'.join(lookups)
+        if link is not None:
+            return WherePath(lookup, link=True, many=many)
+
+        field = get_model_field(model, source)
+        if field is None:
+            raise QueryValidationError(
+                f'Invalid {feature} key "{path}", not a database field'
+            )
+        return WherePath(lookup, field=field, many=many)
+
+    def get_where_reference(self, path):
+        """Get an expression for a field referenced in a where condition
+
+        "parent.x" refers to field x of the parent level's record.
+        """
+        parts = path.split('.')
+        if parts[0] == PARENT_REFERENCE and PARENT_REFERENCE not in self.fields:
+            if not (self.link and self.link.many):
+                raise QueryValidationError(
+                    f'Invalid where value "{path}", {self.path} has no parent record'
+                )
+            parent = self.parent.get_where_path('.'.join(parts[1:]))
+            if parent.many:
+                raise QueryValidationError(
+                    f'Invalid where value "{path}", not a single value'
+                )
+            return Subquery(
+                self.parent.model._default_manager.filter(
+                    pk=OuterRef(PARENT)
+                ).values(parent.lookup)[:1]
+            )
+
+        reference = self.get_where_path(path)
+        if reference.many:
+            raise QueryValidationError(
+                f'Invalid where value "{path}", not a single value'
+            )
+        return F(reference.lookup)
+
+    def get_sort(self):
+        """Get the ordering for this level
+
+        Returns:
+            list of (lookup, descending) pairs, ending in unique keys
+        """
+        sort = self.state.get(SORT) or []
+        order = []
+        for name in sort:
+            if not name:
+                continue
+            descending = name.startswith('-')
+            if descending:
+                name = name[1:]
+            path = self.get_where_path(name, feature=SORT)
+            if path.many:
+                # one row per related record would repeat records
+                raise QueryValidationError(
+                    f'Invalid sort key "{name}" for {self.path}, not a single value'
+                )
+            lookup = path.lookup
+            if path.link:
+                # by ID, not by the related model's Meta.ordering
+                lookup = f'{lookup}__pk'
+            order.append((lookup, descending))
+
+        # always break ties by primary key for stable ordering
+        lookups = {lookup for lookup, _ in order}
+        if 'pk' not in lookups:
+            order.append(('pk', False))
+        if self.link and self.link.many:
+            # the same record can appear once per parent
+            order.append((PARENT, False))
+        return order
+
+    def get_nullable(self, order):
+        """Get the sort lookups that can be NULL
+
+        Returns:
+            set of lookups
+        """
+        schema = get_model_schema(self.model)
+        nullable = set()
+        for lookup, _ in order:
+            if lookup in {'pk', PARENT}:
+                continue
+            # computed fields are not introspected
+            field = schema.get(lookup.replace('__', '.'))
+            if field is None or field['null'] or field['many']:
+                nullable.add(lookup)
+        return nullable
+
+    def sort(self, queryset):
+        order = self.get_sort()
+        nullable = self.get_nullable(order)
+        queryset = self.annotate_sources(queryset)
+        ordering = []
+        for lookup, descending in order:
+            if lookup in nullable:
+                # NULLs sort as the greatest value, on every database
+                ordering.append(
+                    F(lookup).desc(nulls_first=True) if descending
+                    else F(lookup).asc(nulls_last=True)
+                )
+            else:
+                ordering.append(f'-{lookup}' if descending else lookup)
+        return queryset.order_by(*ordering)
+
+    def get_source_expression(self, name):
+        """Get a database expression for a computed field
+
+        Returns:
+            expression, or None if the field's source is a plain path
+            or can only be evaluated in Python
+        """
+        if name not in self.sources:
+            source = self.fields[name].get('source')
+            expression = None
+            if source is not None and not isinstance(source, str):
+                expression = translate_source(source, self.model)
+            self.sources[name] = expression
+        return self.sources[name]
+
+    def get_source_lookup(self, name):
+        """Get the annotation of a computed field, adding it to the query
+
+        Returns:
+            annotation name, or None if the field cannot be computed in SQL
+        """
+        if self.get_source_expression(name) is None:
+            return None
+        self.computed.add(name)
+        return f'{SOURCE_KEY}_{name}'
+
+    def annotate_sources(self, queryset):
+        """Annotate the computed fields used in this level's query"""
+        annotations = {}
+        for name in self.computed:
+            lookup = f'{SOURCE_KEY}_{name}'
+            if lookup not in queryset.query.annotations:
+                annotations[lookup] = self.get_source_expression(name)
+        return queryset.annotate(**annotations) if annotations else queryset
+
+    def get_page(self):
+        page = self.state.get(PAGE)
+        return page if isinstance(page, dict) else {}
+
+    def get_page_size(self):
+        maximum = self.executor.get_page_max()
+        size = self.get_page().get('size')
+        if size is None:
+            return maximum if self.parent is None else None
+        if not isinstance(size, int) or size < 1:
+            raise QueryValidationError(f'Invalid page size "{size}"')
+        return min(size, maximum)
+
+    def paginate(self, queryset, extra=0):
+        """Apply keyset pagination: WHERE (sort keys) > (last keys) LIMIT size
+
+        Arguments:
+            extra: number of rows to fetch beyond the page size
+        """
+        key = self.get_page().get('key')
+        if key:
+            order = self.get_sort()
+            queryset = queryset.filter(get_keyset_filter(
+                order, decode_cursor(key, order), self.get_nullable(order)
+            ))
+        size = self.get_page_size()
+        return queryset[:size + extra] if size else queryset
+
+    def validate(self):
+        """Build this level's query without running it
+
+        Raises:
+            QueryValidationError if a feature of this level is invalid
+        """
+        self.paginate(self.get_queryset())
+
+    def get_cursor(self, row, order, read=getattr):
+        return encode_cursor(order, [
+            read(row, f'{SORT_KEY}{i}') for i in range(len(order))
+        ])
+
+    def annotate_group(self, queryset):
+        """Add this level's aggregates to its query
+
+        Per-record aggregates are correlated subqueries, one per record.
+        Level aggregates run in the same query as AGG(...) OVER (), except
+        on later pages, where the keyset filter would leave out the rows
+        of earlier pages, and for distinct counts: those are computed with
+        one aggregate query over the unpaginated level.
+
+        Returns:
+            (queryset, window), where window is the list of level
+            aggregates to read back from the first row
+        """
+        annotations = {}
+        window = []
+        other = {}
+        paged = bool(self.get_page().get('key'))
+        for aggregate in self.aggregates:
+            if aggregate.per_record:
+                annotations[aggregate.alias] = aggregate.get_record_expression(
+                    self.model
+                )
+            elif aggregate.windowed and not paged:
+                annotations[aggregate.alias] = aggregate.get_window_expression()
+                window.append(aggregate)
+            else:
+                other[aggregate.alias] = aggregate
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        self.group = {}
+        if other:
+            values = self.get_queryset().order_by().aggregate(**{
+                alias: aggregate.get_expression()
+                for alias, aggregate in other.items()
+            })
+            for alias, aggregate in other.items():
+                self.group[aggregate.name] = values[alias]
+        return queryset, window
+
+    def serialize(self, instance):
+        values = []
+        for name in self.columns:
+            if name not in self.take:
+                # per-record aggregate
+                values.append(getattr(instance, f'{GROUP_KEY}_{name}'))
+                continue
+
+            link = self.links.get(name)
+            if link:
+                values.append(get_attribute(instance, link.value))
+                continue
+
+            spec = self.fields[name]
+            source = spec.get('source')
+            if name in self.polymorphic:
+                values.append(self.get_polymorphic_value(instance, name))
+            elif spec.get('getter'):
+                value = get_getter_value(instance, spec['getter'])
+                values.append(to_field_value(value))
+            elif isinstance(source, str):
+                values.append(get_attribute(instance, source))
+            elif name in self.computed:
+                values.append(getattr(instance, f'{SOURCE_KEY}_{name}'))
+            else:
+                values.append(execute(source, instance)[0])
+
+        if self.record_type:
+            return self.record_type(values)
+        return dict(zip(self.columns, values))
+
+    def get_projection(self):
+        """Get the database lookups of this level's record columns
+
+        Returns:
+            list of lookups, one per column, or None if any column is not
+            a database value (a computed source or a model attribute) and
+            records must be read from model instances
+        """
+        schema = get_model_schema(self.model)
+        lookups = []
+        projected = True
+        for name in self.columns:
+            if name not in self.take:
+                lookups.append(f'{GROUP_KEY}_{name}')
+                continue
+
+            link = self.links.get(name)
+            if link:
+                lookups.append(to_lookup(link.value))
+                continue
+
+            source = self.fields[name].get('source')
+            if self.fields[name].get('getter') or name in self.polymorphic:
+                lookup = None
+            elif isinstance(source, str):
+                field = schema.get(source)
+                lookup = to_lookup(source) if field and not field['many'] else None
+            else:
+                # computed in SQL when possible, even if read from instances
+                lookup = self.get_source_lookup(name)
+            if lookup is None:
+                projected = False
+            lookups.append(lookup)
+        return lookups if projected else None
+
+    def get_polymorphic_value(self, instance, name):
+        """Get the "{resource}/{key}" IDs of a polymorphic link field
+
+        IDs of taken links are collected by target resource,
+        to be fetched by fetch_links.
+
+        Raises:
+            QueryExecutionError if a value is not a model instance
+            or a "{resource}/{key}" ID
+        """
+        spec = self.fields[name]
+        source = spec.get('source')
+        field = None
+        if isinstance(source, str):
+            field = get_model_field(self.model, source)
+        if spec.get('getter'):
+            value = get_getter_value(instance, spec['getter'])
+        elif is_generic(field):
+            value = self.get_generic_id(instance, field)
+        else:
+            value = get_attribute(instance, source)
+
+        many = isinstance(value, (list, tuple, QuerySet))
+        ids = [self.get_link_id(v) for v in (value if many else [value])]
+        for id in ids:
+            if id and not (isinstance(id, str) and LINK_SEPARATOR in id):
+                raise QueryExecutionError(
+                    f'Link {self.path}.{name} has invalid ID {id!r}, '
+                    f'expecting "{{resource}}{LINK_SEPARATOR}{{key}}"'
+                )
+        if isinstance(self.take.get(name), dict):
+            targets = self.polymorphic[name]
+            for id in ids:
+                if not id:
+                    continue
+                target, key = id.split(LINK_SEPARATOR, 1)
+                if not targets or target in targets:
+                    self.link_ids.setdefault(target, OrderedDict())[key] = True
+        return ids if many else ids[0]
+
+    def get_generic_id(self, instance, field):
+        """Get the link ID of a generic foreign key without loading it"""
+        from django.contrib.contenttypes.models import ContentType
+
+        ct_field = self.model._meta.get_field(field.ct_field)
+        content_type = getattr(instance, ct_field.attname)
+        key = getattr(instance, field.fk_field)
+        if content_type is None or key is None:
+            return None
+        # content types are cached by the manager
+        model = ContentType.objects.get_for_id(content_type).model_class()
+        name = self.get_link_name(model)
+        return f'{name}{LINK_SEPARATOR}{key}' if name else None
+
+    def get_link_id(self, value):
+        """Render a model instance as a "{resource}/{key}" ID"""
+        if not isinstance(value, Model):
+            return value
+        name = self.get_link_name(type(value))
+        return f'{name}{LINK_SEPARATOR}{value.pk}' if name else None
+
+    def get_link_name(self, model):
+        if model not in self.link_names:
+            resource = self.executor.get_resource_for(model)
+            self.link_names[model] = (
+                resource.get_option('name') if resource else None
+            )
+        return self.link_names[model]
+
+    def get_link_targets(self):
+        """Get the resources of this level's taken polymorphic links
+
+        Returns:
+            list of resource names, all of the space's resources
+            if a taken link does not declare its targets
+        """
+        targets = []
+        for name, names in self.polymorphic.items():
+            if not isinstance(self.take.get(name), dict):
+                continue
+            if not names:
+                return [
+                    resource.get_option('name')
+                    for resource in self.executor.space.resources or []
+                ]
+            targets.extend(n for n in names if n not in targets)
+        return targets
+
+    def get_link_take(self, target):
+        """Get the take state for a polymorphic link target
+
+        The takes of all links to the target are merged and limited to
+        the target's fields, so that one take can apply to many types.
+        """
+        resource = self.executor.get_resource(target, throw=True)
+        fields = self.executor.get_fields(
+            resource, self.executor.get_model(resource)
+        )
+        take = {}
+        for name in self.polymorphic:
+            value = self.take.get(name)
+            if not isinstance(value, dict):
+                continue
+            for field, show in (value.get(TAKE) or {'*': True}).items():
+                if field == '*' or field in fields:
+                    take[field] = show
+        return take
+
+    def fetch_links(self, targets=None):
+        """Fetch the records of taken polymorphic links
+
+        Collected IDs are grouped by target resource: each resource is
+        fetched with one query, however many rows and types the level has.
+
+        Arguments:
+            targets: resource names to fetch, all collected by default
+
+        Returns:
+            dict of resource name -> {key: record}
+        """
+        result = OrderedDict()
+        for target in list(self.link_ids.keys()):
+            if targets is not None and target not in targets:
+                continue
+            keys = self.link_ids.pop(target)
+            resource = self.executor.get_resource(target, throw=True)
+            # records are keyed by primary key, invalid keys are left out
+            pks = get_primary_keys(self.executor.get_model(resource), keys)
+            result[target] = self.executor.get_records(
+                target, list(pks.keys()), take=self.get_link_take(target)
+            )
+        return result
+
+    def get_needs(self):
+        """Get the needs hints of the taken fields"""
+        needs = []
+        for name in self.take:
+            spec_needs = self.fields[name].get('needs')
+            if isinstance(spec_needs, str):
+                spec_needs = [spec_needs]
+            needs.extend(spec_needs or [])
+            prefix = self.get_source_prefix(name)
+            relation = get_model_schema(self.model).get(prefix) if prefix else None
+            if relation and relation['many']:
+                # e.g. "groups.name", read from the prefetched records
+                needs.append(self.fields[name]['source'])
+        return needs
+
+    def prefetch(self, queryset, needs=None):
+        """Load what the taken fields' getters need with the level's rows
+
+        Arguments:
+            needs: needs hints, those of the taken fields by default
+
+        Returns:
+            queryset with the joins and prefetch queries of the
+            merged needs
+        """
+        if needs is None:
+            needs = self.get_needs()
+        if not needs:
+            return queryset
+        select, prefetch = plan_prefetch(self.model, needs)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def serialize_row(self, row):
+        """Serialize a values_list row of ("pk", *projection, ...)"""
+        values = row[1:len(self.columns) + 1]
+        if self.record_type:
+            return self.record_type(values)
+        return dict(zip(self.columns, values))
+
+    def fetch(self, stream=False, chunk_size=None):
+        """Iterate over the rows of this level's query
+
+        Arguments:
+            stream: read rows through a server-side cursor
+            chunk_size: rows per cursor fetch when streaming
+
+        Yields:
+            (pk, record, parent) tuples, where record is None for
+            levels that only render IDs and parent is None unless this
+            is a to-many level
+
+        Rows are read with values_list, selecting only the primary key,
+        the record's columns and the annotations needed for links, cursors
+        and aggregates. Levels with columns that are not database values
+        fall back to model instances.
+
+        Sets self.count and self.cursor, and self.ids for root levels
+        """
+        size = self.get_page_size()
+        queryset = self.get_queryset()
+        queryset, window = self.annotate_group(queryset)
+        order = self.get_sort()
+        many = self.link is not None and self.link.many
+        keys = []
+        if many:
+            keys.append(PARENT)
+        keys.extend(aggregate.alias for aggregate in window)
+        if size:
+            # read back the sort key of the last record for the cursor
+            sort_keys = {
+                f'{SORT_KEY}{i}': F(lookup) for i, (lookup, _) in enumerate(order)
+            }
+            queryset = queryset.annotate(**sort_keys)
+            keys.extend(sort_keys)
+
+        projection = self.get_projection() if self.take else []
+        queryset = self.annotate_sources(queryset)
+        needs = []
+        if projection is None:
+            needs = self.get_needs()
+            queryset = self.prefetch(queryset, needs)
+            read = getattr
+            serialize = self.serialize
+        else:
+            lookups = ['pk'] + projection + keys
+            queryset = queryset.values_list(*lookups)
+            positions = {lookup: i for i, lookup in enumerate(lookups)}
+
+            def read(row, name):
+                return row[positions[name]]
+
+            serialize = self.serialize_row
+
+        queryset = self.paginate(queryset, extra=1)
+        if stream and (not needs or django.VERSION >= (4, 1)):
+            # iterator() only prefetches per chunk since Django 4.1
+            queryset = queryset.iterator(chunk_size=chunk_size or CHUNK_SIZE)
+
+        ids = [] if self.parent is None else None
+        count = 0
+        last = None
+        self.cursor = None
+        for row in queryset:
+            if size and count == size:
+                # one extra row fetched: there is a next page
+                self.cursor = self.get_cursor(last, order, read=read)
+                break
+
+            pk = read(row, 'pk')
+            count += 1
+            if ids is not None:
+                ids.append(pk)
+            if count == 1:
+                for aggregate in window:
+                    self.group[aggregate.name] = read(row, aggregate.alias)
+            yield (
+                pk,
+                serialize(row) if self.take else None,
+                read(row, PARENT) if many else None
+            )
+            last = row
+
+        if not count:
+            for aggregate in window:
+                self.group[aggregate.name] = aggregate.empty
+        self.ids = ids
+        self.count = count
+
+    def execute(self, data):
+        """Run this level's query and its children's, writing into data
+
+        Sets self.cursor to the next page key if there are more records.
+
+        Returns:
+            list of primary keys fetched at this level (root levels only)
+        """
+        records = data.setdefault(self.name, {}) if self.take else None
+        links = None
+        if self.link and self.link.many:
+            links = data.setdefault(self.key, {})
+
+        for pk, record, parent in self.fetch():
+            if records is not None:
+                records[pk] = merge_record(records.get(pk), record)
+            if links is not None:
+                links.setdefault(parent, []).append(pk)
+
+        for name, linked in self.fetch_links().items():
+            records = data.setdefault(name, {})
+            for pk, record in linked.items():
+                records[pk] = merge_record(records.get(pk), record)
+
+        if self.count:
+            # no rows at this level means nothing to fetch below it
+            for child in self.children:
+                child.execute(data)
+        return self.ids
+
+    def get_levels(self):
+        """Iterate over this level and all levels below it"""
+        yield self
+        for child in self.children:
+            yield from child.get_levels()
+
+
+class Executor(object):
+    """Executes Query, returns dict response
+
+    Arguments:
+        space: space to execute queries in
+        compact: render records as compact Record tuples instead of dicts,
+            for holding large result sets in memory
+    """
+
+    def __init__(self, space, compact=False, **kwargs):
+        self.space = space
+        self.compact = compact
+
+    def get_feature(self, name):
+        """Get the server's settings for a feature, e.g. {"max": 1000}"""
+        server = self.space.server if self.space else None
+        features = server.features if server else None
+        return features.get(name) if isinstance(features, dict) else None
+
+    def get(self, query, identity=None):
+        """
+            Arguments:
+                query: query dict
+                identity: user identity dict
+        """
+        raise NotImplementedError()
+
+
+class DjangoExecutor(Executor):
+    """Executes queries against Django models, one query per level
+
+    Response:
+        {
+            "key": {"users": [1, 2]},
+            "data": {
+                "users": {1: {...}, 2: {...}},
+                "users.groups": {1: [3], 2: [3, 4]},
+                "groups": {3: {...}, 4: {...}}
+            }
+        }
+    """
+
+    Level = Level
+
+    def get(self, query, identity=None):
+        state = getattr(query, 'state', query)
+        data = {}
+        key = {}
+        page = {}
+        group = {}
+        for level in self.get_levels(state):
+            ids = level.execute(data)
+            for sub in level.get_levels():
+                if sub.cursor:
+                    page[sub.path] = {'next': sub.cursor}
+                if sub.group:
+                    group[sub.path] = sub.group
+            key.update(self.get_key(state, level, ids, data))
+        result = {"key": key, "data": data}
+        meta = self.get_meta(page, group)
+        if meta:
+            result["meta"] = meta
+        return result
+
+    def get_meta(self, page, group):
+        """Get the response meta from page cursors and level aggregates
+
+        Arguments:
+            page: dict of level path -> {"next": cursor}
+            group: dict of level path -> {name: value}
+        """
+        meta = {}
+        if page:
+            meta["page"] = page
+        if group:
+            meta["group"] = group
+        return meta
+
+    def get_key(self, state, level, ids, data):
+        """Get the response key for a root level
+
+        Arguments:
+            state: query state
+            level: root level
+            ids: primary keys fetched by the root level
+            data: response data, must contain the root record and
+                the field's links for field queries
+        """
+        if level.state.get('record') is not None:
+            ids = ids[0] if ids else None
+        if not state.get('field'):
+            return {level.name: ids}
+
+        child = level.children[0] if level.children else None
+        field = list(level.take.keys())[0]
+        link = level.links.get(field)
+        if not link:
+            raise QueryValidationError(f'Field "{field}" is not a link')
+        name = link.resource.get_option('name') if link.resource else field
+        if ids is None:
+            return {name: None}
+        if link.many:
+            return {name: data.get(child.key, {}).get(ids, [])}
+        return {name: data[level.name][ids][field]}
+
+    def get_records(self, name, keys, take=None):
+        """Fetch records of a resource by primary key with one query
+
+        Arguments:
+            take: take state, all non-lazy fields by default
+
+        Returns:
+            dict of key -> record, missing keys are left out
+        """
+        resource = self.get_resource(name, throw=True)
+        level = self.Level(self, resource, {TAKE: take} if take else None)
+        pks = get_primary_keys(level.model, keys)
+        queryset = level.get_queryset().filter(pk__in=list(pks.keys()))
+        projection = level.get_projection()
+        queryset = level.annotate_sources(queryset)
+        records = {}
+        if projection is None:
+            for instance in level.prefetch(queryset):
+                records[pks[instance.pk]] = level.serialize(instance)
+        else:
+            for row in queryset.values_list('pk', *projection):
+                records[pks[row[0]]] = level.serialize_row(row)
+        return records
+
+    def get_values(self, name, field, keys):
+        """Fetch one field of many records by primary key with one query
+
+        To-many links are read as (record, related ID) pairs of a join.
+
+        Returns:
+            dict of key -> value, missing keys are left out
+        """
+        resource = self.get_resource(name, throw=True)
+        level = self.Level(self, resource, {TAKE: {field: True}})
+        link = level.links.get(field)
+        if not (link and link.many):
+            records = self.get_records(name, keys, take={field: True})
+            return {key: record[field] for key, record in records.items()}
+
+        pks = get_primary_keys(level.model, keys)
+        queryset = level.get_base_queryset().filter(
+            pk__in=list(pks.keys())
+        ).order_by('pk', link.lookup).values_list('pk', link.lookup)
+        values = {}
+        for pk, related in queryset:
+            ids = values.setdefault(pks[pk], [])
+            if related is not None:
+                ids.append(related)
+        return values
+
+    def get_levels(self, state):
+        """Get the root levels for a query state
+
+        A resource query has one root level.
+        A space query has one root level per taken resource.
+        """
+        name = state.get('.resource')
+        if name:
+            resource = self.get_resource(name, throw=True)
+            field = state.get('field')
+            if field:
+                # e.g. GET /posts/1/comments: fetch the parent record and
+                # take the field, passing through the remaining features
+                child = {
+                    k: v for k, v in state.items()
+                    if k in {TAKE, SORT, WHERE, GROUP, PAGE}
+                }
+                state = {
+                    'record': state.get('record'),
+                    TAKE: {field: child}
+                }
+            level = self.Level(self, resource, state)
+            if field and field not in level.links:
+                # checked here, before a response starts streaming
+                raise QueryValidationError(f'Field "{field}" is not a link')
+            return [level]
+
+        take = state.get(TAKE) or {}
+        levels = []
+        for name, value in take.items():
+            if value is False:
+                continue
+            resource = self.get_resource(name, throw=True)
+            sub = value if isinstance(value, dict) else {}
+            if PAGE in state and PAGE not in sub:
+                sub = dict(sub, **{PAGE: state[PAGE]})
+            levels.append(self.Level(self, resource, sub))
+        return levels
+
+    def get_resource(self, name, throw=False):
+        for resource in self.space.resources or []:
+            if resource.get_option('name') == name:
+                return resource
+        if throw:
+            raise QueryValidationError(f'Invalid resource "{name}"')
+        return None
+
+    def get_resource_for(self, model):
+        label = model._meta.label_lower
+        for resource in self.space.resources or []:
+            source = self.get_source(resource)
+            if source and source.lower() == label:
+                return resource
+        return None
+
+    def get_source(self, resource):
+        return resource.get_option('source') or resource.get_option('model')
+
+    def get_model(self, resource):
+        from django.apps import apps
+
+        source = self.get_source(resource)
+        if not isinstance(source, str):
+            raise QueryExecutionError(
+                f'Resource "{resource.get_option("name")}" has no model source'
+            )
+        return apps.get_model(source)
+
+    def get_fields(self, resource, model):
+        """Get normalized field specs: name -> spec with a source"""
+        server = self.space.server if self.space else None
+        if server:
+            compiled = server.get_compiled_fields(
+                self.space.name, resource.get_option('name')
+            )
+            if compiled is not None:
+                # resolved ahead of time by the resource_snapshot command
+                return compiled
+
+        fields = resource.get_option('fields') or {}
+        if fields == '*':
+            fields = {name: name for name in get_model_schema(model).fields}
+        elif isinstance(fields, (list, tuple)):
+            fields = {name: name for name in fields}
+
+        result = {}
+        for name, spec in fields.items():
+            if isinstance(spec, dict):
+                spec = dict(spec)
+                spec.setdefault('source', name)
+            else:
+                spec = {'source': spec}
+            result[name] = spec
+        return result
+
+    def get_page_max(self):
+        page = self.get_feature(PAGE)
+        if isinstance(page, dict):
+            return page.get('max', DEFAULT_PAGE_MAX)
+        return DEFAULT_PAGE_MAX
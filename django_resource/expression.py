@@ -1,5 +1,14 @@
 import re
-from .utils import resolve, get
+from functools import lru_cache
+from .utils import resolve, get, TEMPLATE_CACHE_SIZE
+
+SELF_REGEX = re.compile(r"{{\s*\.")
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def rewrite_self(expression):
+    """Rewrite {{ .x }} references to {{ self.x }}, once per expression"""
+    return SELF_REGEX.sub("{{ self.", expression)
 
 
 def resolve_expression(expression, context):
@@ -30,10 +39,9 @@ def format_expression(expression, context):
             for k, v in expression.items()
         }
     elif isinstance(expression, list):
-        return [format_expression(v) for v in expression]
+        return [format_expression(v, context) for v in expression]
     else:
-        expression = re.sub(r"{{\s*\.", "{{ self.", expression)
-        return resolve(expression, {"self": context})
+        return resolve(rewrite_self(expression), {"self": context})
 
 
 def join_expression(expression, context):
@@ -41,8 +49,8 @@ def join_expression(expression, context):
         return expression
 
     if isinstance(expression, dict):
-        # {"join": {"values": ["a", "b"], "separator": "/"}}
-        values = expression.get('values')
+        # {"join": {"items": ["a", "b"], "separator": "/"}}
+        values = expression.get('items', expression.get('values'))
         separator = expression.get('separator', ' ')
         values = [get_expression(v, context) for v in values]
         return separator.join(values)
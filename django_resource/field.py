@@ -1,9 +1,42 @@
+from contextlib import contextmanager
+from threading import local
+
 from .utils import cached_property
-from .types import is_link, is_list, validate
+from .types import get_links, is_link, is_list, compile_type
 from .resource import Resource, is_resolved
 from .expression import execute
 from .exceptions import TypeValidationError
 
+# inverse updates collected by defer_inverses, per thread
+_deferred = local()
+
+
+@contextmanager
+def defer_inverses():
+    """Collect inverse link updates and apply them on exit
+
+    Within the context, each target field's pending updates are queued
+    and then applied in one batch per field, instead of one add_value
+    or set_value per link. Nested contexts apply with the outermost one.
+    If the body raises, the queued updates are dropped, not applied.
+
+    Example:
+        with defer_inverses():
+            space.add("resources", resources)
+    """
+    if getattr(_deferred, 'pending', None) is not None:
+        yield
+        return
+
+    # id(field) -> (field, [(operation, parent)])
+    pending = _deferred.pending = {}
+    try:
+        yield
+    finally:
+        _deferred.pending = None
+    for field, operations in pending.values():
+        field.apply_inverses(operations)
+
 
 class Field(Resource):
     class Schema:
@@ -47,6 +80,7 @@ class Field(Resource):
         type = self.get_option('type')
         self._is_link = is_link(type)
         self._is_list = is_list(type)
+        self._validate = compile_type(type)
 
     def setup(self):
         if not self._setup:
@@ -107,21 +141,30 @@ class Field(Resource):
         return space
 
     def get_link(self, value):
-        if is_resolved(value):
+        if value is None or is_resolved(value):
             return value
 
-        return self.get_space().resolve(self.type, value)
+        space = self.get_space()
+        links = get_links(self.type)
+        if self._is_list and isinstance(value, list) and len(links) == 1:
+            # links to one resource: resolve all in one pass
+            return space.resolve_links(links[0], value)
+        return space.resolve(self.type, value)
 
-    def validate(self, type, value):
+    def validate(self, value):
         try:
-            return validate(type, value)
+            return self._validate(value)
         except TypeValidationError as e:
             print(f"{self.name} validation failed: {e}")
             raise
 
     def set_value(self, value, set_inverse=True):
-        type = self.get_option('type')
-        self.validate(type, value)
+        self.validate(value)
+        if self._is_list and isinstance(value, list):
+            # own the list: add/remove change it in place
+            value = list(value)
+        # the ID index is rebuilt on the next add or remove
+        self.__dict__.pop("_ids", None)
         if self._is_link:
             link = None
 
@@ -132,8 +175,6 @@ class Field(Resource):
 
                 self._value = value
                 self.__dict__["_link"] = link
-                if set_inverse and self.inverse:
-                    self.set_inverse(link)
             else:
                 # id or ids given
                 self._value = value
@@ -156,68 +197,180 @@ class Field(Resource):
             value = [value]
 
         inverse = self.inverse
+        pending = getattr(_deferred, 'pending', None)
 
         for v in value:
             inverse_field = v.get_field(inverse)
-            if inverse_field._is_list:
+            if pending is not None:
+                inverse_field.defer_inverse(pending, 'add', parent)
+            elif inverse_field._is_list:
                 inverse_field.add_value(parent, set_inverse=False)
             else:
                 inverse_field.set_value(parent, set_inverse=False)
 
-    def add_value(self, new_value, set_inverse=True, index=None):
-        if self._is_list:
-            self.setup()
-
-            value = self._value
-            link = None
+    def remove_inverse(self, value):
+        parent = self.parent
+        if not parent:
+            return
 
-            if value is None:
-                value = self._value = []
+        inverse = self.inverse
+        pending = getattr(_deferred, 'pending', None)
 
-            if not isinstance(new_value, list):
-                new_value = [new_value]
+        for v in value:
+            inverse_field = v.get_field(inverse)
+            if pending is not None:
+                inverse_field.defer_inverse(pending, 'remove', parent)
+            else:
+                # single links are cleared if they still point at parent
+                inverse_field.remove_value(parent, set_inverse=False)
+
+    def defer_inverse(self, pending, operation, parent):
+        key = id(self)
+        if key not in pending:
+            pending[key] = (self, [])
+        pending[key][1].append((operation, parent))
+
+    def apply_inverses(self, operations):
+        """Apply queued inverse updates
+
+        Runs of the same operation are applied as one batch;
+        a single link is set or cleared by each operation in turn.
+
+        Arguments:
+            operations: list of ("add" or "remove", parent)
+        """
+        if not self._is_list:
+            for operation, parent in operations:
+                if operation == 'add':
+                    self.set_value(parent, set_inverse=False)
+                else:
+                    self.remove_value(parent, set_inverse=False)
+            return
 
-            ids = None
-            link = None
-            resolved = None
-
-            if self._is_link:
-                resolved = is_resolved(new_value)
-                link = self._link
-                ids = set([v.get_id() if hasattr(v, 'get_id') else v for v in link])
-
-            news = []
-            for v in new_value:
-                if self._is_link:
-                    # check ids before adding
-                    if resolved:
-                        id = v.get_id()
-                        if id not in ids:
-                            ids.add(id)
-                            news.append(v)
-                            value.append(id)
-                            link.append(v)
-                    else:
-                        if v not in ids:
-                            ids.add(v)
-                            value.append(v)
-                            news.append(v)
+        batch = []
+        for i, (operation, parent) in enumerate(operations):
+            batch.append(parent)
+            if i + 1 == len(operations) or operations[i + 1][0] != operation:
+                if operation == 'add':
+                    self.add_value(batch, set_inverse=False)
                 else:
-                    # add directly
-                    value.append(v)
+                    self.remove_value(batch, set_inverse=False)
+                batch = []
 
-            if self._is_link and not resolved:
-                # news has ids
-                news = self.get_link(news)
-                link.extend(news)
+    def get_ids(self):
+        """Get the set of IDs in a list link
 
-            if set_inverse and self.inverse and news:
-                self.set_inverse(news)
-        else:
+        Built once, then kept up to date by add_value and remove_value
+        """
+        ids = self.__dict__.get('_ids')
+        if ids is None:
+            self.setup()
+            ids = self.__dict__['_ids'] = set(self._value or ())
+        return ids
+
+    def add_value(self, new_value, set_inverse=True, index=None):
+        """Add one value or a list of values to a list field
+
+        Links already in the list are skipped. New links are resolved
+        and their inverses updated once per call, so add a batch of
+        values at once rather than one at a time.
+        """
+        if not self._is_list:
             # cannot add on a non-list
             # TODO: support this for strings, objects, numbers
             raise NotImplementedError()
 
+        self.setup()
+        if self._value is None:
+            self._value = []
+        value = self._value
+
+        if not isinstance(new_value, list):
+            new_value = [new_value]
+
+        if not self._is_link:
+            # add directly
+            value.extend(new_value)
+            return
+
+        link = self._link
+        ids = self.get_ids()
+        resolved = is_resolved(new_value)
+        news = []
+        for v in new_value:
+            id = v.get_id() if resolved else v
+            if id not in ids:
+                ids.add(id)
+                value.append(id)
+                news.append(v)
+
+        if not news:
+            return
+
+        if not resolved:
+            # news has ids
+            news = self.get_link(news)
+        link.extend(news)
+
+        if set_inverse and self.inverse:
+            self.set_inverse(news)
+
+    def remove_value(self, old_value, set_inverse=True):
+        """Remove one value or a list of values from a list field
+
+        Inverses of removed links are updated once per call.
+        Other fields are set to None if they hold old_value.
+        """
+        if not self._is_list:
+            self.remove_single_value(old_value, set_inverse=set_inverse)
+            return
+
+        self.setup()
+        value = self._value
+        if not value:
+            return
+
+        if not isinstance(old_value, list):
+            old_value = [old_value]
+
+        if not self._is_link:
+            value[:] = [v for v in value if v not in old_value]
+            return
+
+        link = self._link
+        ids = self.get_ids()
+        resolved = is_resolved(old_value)
+        removed = ids.intersection(
+            v.get_id() if resolved else v for v in old_value
+        )
+        if not removed:
+            return
+
+        ids -= removed
+        # IDs and links are kept in the same order
+        olds = [v for id, v in zip(value, link) if id in removed]
+        link[:] = [v for id, v in zip(value, link) if id not in removed]
+        value[:] = [id for id in value if id not in removed]
+
+        if set_inverse and self.inverse:
+            self.remove_inverse(olds)
+
+    def remove_single_value(self, old_value, set_inverse=True):
+        self.setup()
+        old_link = None
+        if self._is_link:
+            if is_resolved(old_value):
+                old_value = old_value.get_id()
+            if self._value != old_value:
+                return
+            old_link = self._link
+        elif self._value != old_value:
+            return
+
+        self.set_value(None, set_inverse=False)
+        if old_link is not None and set_inverse and self.inverse:
+            self.remove_inverse([old_link])
+
     @cached_property
     def _link(self):
         return self.get_link(self._value)
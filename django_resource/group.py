@@ -0,0 +1,117 @@
+from django.db.models import Avg, Count, Max, Min, OuterRef, Subquery, Sum, Window
+
+from .exceptions import QueryValidationError
+from .features import GROUP
+
+# operator -> (aggregate, distinct)
+OPERATORS = {
+    'max': (Max, False),
+    'min': (Min, False),
+    'sum': (Sum, False),
+    'count': (Count, False),
+    'average': (Avg, False),
+    'distinct': (Count, True),
+}
+# operators that count rows, 0 rather than null over no rows
+COUNT_OPERATORS = {'count', 'distinct'}
+# annotation prefix for aggregates read back from each row
+GROUP_KEY = '_group'
+
+
+class Aggregate(object):
+    """One named aggregate of a group spec
+
+    Aggregates over paths that cross a to-many link are computed per
+    record ({"item_count": {"count": "items.id"}} counts each tag's items)
+    and rendered as a field of each record.
+    Aggregates over single-valued paths are computed over all rows of
+    the level ({"most_recent": {"max": "created"}}) and rendered in
+    the response's "meta.group".
+
+    Arguments:
+        name: name of the aggregate in the response
+        operator: one of OPERATORS
+        path: WherePath of the aggregated field
+    """
+
+    def __init__(self, name, operator, path):
+        self.name = name
+        self.operator = operator
+        self.path = path
+
+    @property
+    def per_record(self):
+        return self.path.many
+
+    @property
+    def alias(self):
+        return f'{GROUP_KEY}_{self.name}'
+
+    @property
+    def windowed(self):
+        """Whether the aggregate can run as a window function"""
+        # databases do not allow DISTINCT in window aggregates
+        return not OPERATORS[self.operator][1]
+
+    @property
+    def empty(self):
+        """Value over no rows"""
+        return 0 if self.operator in COUNT_OPERATORS else None
+
+    def get_expression(self):
+        function, distinct = OPERATORS[self.operator]
+        if distinct:
+            return function(self.path.lookup, distinct=True)
+        return function(self.path.lookup)
+
+    def get_record_expression(self, model):
+        """Get a per-record aggregate as a correlated subquery
+
+        Each aggregate gets its own GROUP BY over the record's related rows,
+        so aggregates over different links never multiply each other,
+        and the main query is neither grouped nor joined.
+        """
+        return Subquery(
+            model._default_manager.filter(pk=OuterRef('pk'))
+            .order_by()
+            .values('pk')
+            .annotate(**{self.alias: self.get_expression()})
+            .values(self.alias)
+        )
+
+    def get_window_expression(self):
+        """Get a level aggregate as a window over all rows: AGG(...) OVER ()"""
+        return Window(expression=self.get_expression())
+
+
+def get_aggregates(group, level, operators=None):
+    """Resolve a group spec against a level
+
+    Arguments:
+        group: dict of name -> {operator: path}, e.g.
+            {"item_count": {"count": "items.id"}}
+        level: executor level, resolves paths with get_where_path
+        operators: operators allowed by the group feature, or None for all
+
+    Returns:
+        list of Aggregate
+    """
+    if not isinstance(group, dict):
+        raise QueryValidationError(f'Invalid group "{group}"')
+
+    aggregates = []
+    for name, spec in group.items():
+        if not isinstance(spec, dict) or len(spec) != 1:
+            raise QueryValidationError(
+                f'Invalid group "{name}", expecting one operator'
+            )
+        operator, path = next(iter(spec.items()))
+        if operator not in OPERATORS or (
+            operators is not None and operator not in operators
+        ):
+            raise QueryValidationError(f'Invalid group operator "{operator}"')
+        if not isinstance(path, str):
+            raise QueryValidationError(f'Invalid group field "{path}"')
+        path = level.get_where_path(path, feature=GROUP)
+        aggregates.append(Aggregate(name, operator, path))
+    return aggregates
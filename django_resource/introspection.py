@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignObjectRel, NOT_PROVIDED
+
+# Django internal field type -> resource type
+FIELD_TYPES = {
+    'AutoField': 'number',
+    'BigAutoField': 'number',
+    'SmallAutoField': 'number',
+    'IntegerField': 'number',
+    'BigIntegerField': 'number',
+    'SmallIntegerField': 'number',
+    'PositiveIntegerField': 'number',
+    'PositiveSmallIntegerField': 'number',
+    'FloatField': 'number',
+    'DecimalField': 'number',
+    'BooleanField': 'boolean',
+    'NullBooleanField': 'boolean',
+    'CharField': 'string',
+    'TextField': 'string',
+    'SlugField': 'string',
+    'UUIDField': 'string',
+    'FilePathField': 'string',
+    'FileField': 'string',
+    'ImageField': 'string',
+    'GenericIPAddressField': 'string',
+    'IPAddressField': 'string',
+    'DateField': 'string',
+    'DateTimeField': 'string',
+    'TimeField': 'string',
+    'DurationField': 'string',
+    'BinaryField': 'string',
+    'JSONField': 'any',
+}
+# number of distinct models kept introspected
+CACHE_SIZE = 1024
+
+
+def to_lookup(source):
+    """Convert a dotted source path into a Django lookup"""
+    return source.replace('.', '__')
+
+
+def get_model_field(model, source):
+    """Get the model field at the end of a dotted source path
+
+    Returns:
+        field, or None if source is not a path of model fields
+    """
+    field = None
+    for part in source.split('.'):
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model if field.is_relation else None
+    return field
+
+
+def nullable(type):
+    return ['null', type] if isinstance(type, str) else {'anyOf': ['null', type]}
+
+
+def get_field_schema(field):
+    """Get the schema of a model field, relation or reverse relation
+
+    Returns:
+        dict with source, type, default, choices, description,
+        unique, index, null, many and related_model keys
+    """
+    reverse = isinstance(field, ForeignObjectRel)
+    related_model = field.related_model if field.is_relation else None
+    many = field.is_relation and bool(field.one_to_many or field.many_to_many)
+
+    if related_model is not None:
+        # IDs unless resolved to a link by the schema resolver
+        type = get_field_schema(related_model._meta.pk)['type']
+    elif hasattr(field, 'get_internal_type'):
+        type = FIELD_TYPES.get(field.get_internal_type(), 'any')
+    else:
+        # e.g. generic foreign keys
+        type = 'any'
+
+    null = True if reverse and not many else bool(getattr(field, 'null', False))
+    if many:
+        type = {'type': 'array', 'items': type}
+    elif null:
+        type = nullable(type)
+
+    default = getattr(field, 'default', NOT_PROVIDED)
+    if default is NOT_PROVIDED or callable(default):
+        default = None
+
+    choices = getattr(field, 'choices', None)
+    if choices:
+        choices = [value for value, _ in field.flatchoices]
+
+    description = None
+    if not reverse:
+        description = str(getattr(field, 'help_text', '') or '') or None
+
+    return {
+        'source': field.name,
+        'type': type,
+        'default': default,
+        'choices': choices or None,
+        'description': description,
+        'unique': bool(getattr(field, 'unique', False)),
+        'index': bool(
+            getattr(field, 'db_index', False) or getattr(field, 'unique', False)
+        ),
+        'null': null,
+        'many': many,
+        'related_model': related_model,
+    }
+
+
+class ModelSchema(object):
+    """Field schemas of a model, built by walking Model._meta once
+
+    Paths through relations ("profile.avatar") are resolved on first
+    use and kept, so each later lookup is a single dict access. Invalid
+    paths are not kept, so arbitrary input does not grow the cache.
+    Get instances with get_model_schema.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        # concrete and forward fields, used to expand "*"
+        self.fields = OrderedDict()
+        # source path -> schema, for fields and resolved relation paths
+        self.paths = {}
+        for field in model._meta.get_fields():
+            schema = get_field_schema(field)
+            if isinstance(field, ForeignObjectRel):
+                # reverse relations are reached by their query name
+                self.paths[field.name] = schema
+            else:
+                self.fields[field.name] = schema
+                self.paths[field.name] = schema
+
+    def get(self, path):
+        """Get the schema at a source path
+
+        Returns:
+            schema dict, or None if path does not exist
+        """
+        try:
+            return self.paths[path]
+        except KeyError:
+            schema = self.resolve(path)
+            if schema is not None:
+                self.paths[path] = schema
+            return schema
+
+    def resolve(self, path):
+        name, _, rest = path.partition('.')
+        if not rest:
+            return None
+
+        parent = self.paths.get(name)
+        if parent is None or parent['related_model'] is None:
+            return None
+
+        schema = get_model_schema(parent['related_model']).get(rest)
+        if schema is None:
+            return None
+
+        schema = dict(schema, source=path)
+        if parent['many'] and not schema['many']:
+            # one value per related record
+            schema['type'] = {'type': 'array', 'items': schema['type']}
+            schema['many'] = True
+        elif parent['null'] and not schema['null']:
+            schema['type'] = nullable(schema['type'])
+            schema['null'] = True
+        # not unique or indexed through a relation
+        schema['unique'] = schema['index'] = False
+        return schema
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_model_schema(model):
+    """Get the cached ModelSchema of a model class"""
+    return ModelSchema(model)
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+
+# request attribute holding the request's loaders
+REQUEST_ATTRIBUTE = '_resource_loaders'
+
+
+class LazyValue(object):
+    """Value of a lazy field, fetched when first read
+
+    Reading any queued value fetches every value queued on the loader
+    so far, one query per field.
+    """
+
+    __slots__ = ('loader', 'name', 'field', 'key')
+
+    def __init__(self, loader, name, field, key):
+        self.loader = loader
+        self.name = name
+        self.field = field
+        self.key = key
+
+    def get(self):
+        return self.loader.get(self.name, self.field, self.key)
+
+    def __repr__(self):
+        return f'LazyValue({self.name}.{self.field}: {self.key})'
+
+
+class Loader(object):
+    """Batches and memoizes lazy field reads, DataLoader-style
+
+    Reads are queued with load, deduplicated by key and fetched together
+    when the first of them is read (a tick): one query per field, however
+    many records were queued. Fetched values are kept for the loader's
+    lifetime, which should be one request (see get_loader).
+
+    Queries never need it: taken lazy fields are fetched with one query
+    per level. It is for code that reads lazy fields record by record,
+    such as custom views and getters.
+
+    Example:
+        groups = [loader.load("users", "groups", user) for user in users]
+        [value.get() for value in groups]  # one query
+
+    Arguments:
+        executor: DjangoExecutor of the space, fetches with get_values
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        # (resource, field) -> keys to fetch, in order
+        self.pending = OrderedDict()
+        # (resource, field) -> {key: value}
+        self.values = {}
+        # number of batched fetches, one per field per tick
+        self.fetches = 0
+
+    def load(self, name, field, key):
+        """Queue a field of a record
+
+        Returns:
+            LazyValue
+        """
+        values = self.values.get((name, field))
+        if values is None or key not in values:
+            self.pending.setdefault((name, field), OrderedDict())[key] = True
+        return LazyValue(self, name, field, key)
+
+    def load_many(self, name, field, keys):
+        return [self.load(name, field, key) for key in keys]
+
+    def get(self, name, field, key):
+        """Get a field of a record, fetching all queued fields if needed
+
+        Returns:
+            value, or None if there is no such record
+        """
+        values = self.values.get((name, field))
+        if values is None or key not in values:
+            self.load(name, field, key)
+            self.dispatch()
+            values = self.values[(name, field)]
+        return values.get(key)
+
+    def get_many(self, name, field, keys):
+        values = self.load_many(name, field, keys)
+        return [value.get() for value in values]
+
+    def dispatch(self):
+        """Fetch every queued field, one query per field"""
+        pending, self.pending = self.pending, OrderedDict()
+        for (name, field), keys in pending.items():
+            values = self.values.setdefault((name, field), {})
+            missing = [key for key in keys if key not in values]
+            if not missing:
+                continue
+            fetched = self.executor.get_values(name, field, missing)
+            self.fetches += 1
+            for key in missing:
+                # remember missing records too, to fetch them once
+                values[key] = fetched.get(key)
+
+
+def get_loader(request, executor):
+    """Get the loader of an executor's space for a request
+
+    Loaders are kept on the request, one per space name, so values are
+    memoized for the rest of the request and never shared between requests.
+    """
+    loaders = getattr(request, REQUEST_ATTRIBUTE, None)
+    if loaders is None:
+        loaders = {}
+        setattr(request, REQUEST_ATTRIBUTE, loaders)
+    name = executor.space.name
+    loader = loaders.get(name)
+    if loader is None:
+        loader = loaders[name] = Loader(executor)
+    return loader
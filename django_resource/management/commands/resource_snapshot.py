@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from django_resource.conf import get_setting
+from django_resource.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the resource server's schema into a snapshot file "
+        "that workers load at startup"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server",
+            help='Import path of the server, defaults to DJANGO_RESOURCE["SERVER"]',
+        )
+        parser.add_argument(
+            "--output",
+            help='Snapshot path, defaults to DJANGO_RESOURCE["SNAPSHOT"]',
+        )
+
+    def handle(self, *args, **options):
+        server = options["server"] or get_setting("SERVER")
+        path = options["output"] or get_setting("SNAPSHOT")
+        if not server:
+            raise CommandError('Pass --server or set DJANGO_RESOURCE["SERVER"]')
+        if not path:
+            raise CommandError('Pass --output or set DJANGO_RESOURCE["SNAPSHOT"]')
+
+        try:
+            server = import_string(server)
+        except ImportError as e:
+            raise CommandError(f"Failed to import server: {e}")
+
+        snapshot = write_snapshot(server, path)
+        count = sum(len(resources) for resources in snapshot["spaces"].values())
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote snapshot of {count} resources to {path}")
+        )
@@ -0,0 +1,121 @@
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from django.db.models.manager import BaseManager
+
+from .exceptions import QueryExecutionError
+
+INDEX_REGEX = re.compile(r'^-?\d+$')
+# last part of a need covering every field of the related records
+ALL_FIELDS = '*'
+
+
+def get_relation_path(model, need):
+    """Walk a needs hint across model relations
+
+    Example:
+        get_relation_path(User, "groups.*") -> [("groups", True)]
+        get_relation_path(Post, "author.groups.name")
+            -> [("author", False), ("groups", True)]
+
+    Returns:
+        list of (relation name, to-many) pairs, in order
+    """
+    path = []
+    for part in need.split('.'):
+        if part == ALL_FIELDS:
+            break
+        if model is None:
+            # the previous part was not a relation
+            raise QueryExecutionError(f'Invalid needs "{need}"')
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            raise QueryExecutionError(f'Invalid needs "{need}"')
+        if not field.is_relation:
+            model = None
+            continue
+        # generic foreign keys have no related model and need a query
+        many = bool(
+            field.many_to_many or field.one_to_many
+            or field.related_model is None
+        )
+        path.append((part, many))
+        model = field.related_model
+    return path
+
+
+def plan_prefetch(model, needs):
+    """Merge needs hints into one plan of joins and prefetch queries
+
+    To-one relations are joined with select_related. Paths with a to-many
+    hop are prefetched, with one query per to-many relation; the to-one
+    relations leading up to them are joined.
+
+    Arguments:
+        needs: iterable of dotted paths, e.g. ["groups.*", "profile.city"]
+
+    Returns:
+        (select, prefetch), lists of lookups for select_related
+        and prefetch_related without redundant prefixes
+    """
+    select = set()
+    prefetch = set()
+    for need in needs:
+        path = get_relation_path(model, need)
+        names = [name for name, _ in path]
+        many = [i for i, (_, to_many) in enumerate(path) if to_many]
+        if not many:
+            if names:
+                select.add('__'.join(names))
+            continue
+        if many[0]:
+            select.add('__'.join(names[: many[0]]))
+        prefetch.add('__'.join(names))
+    return remove_prefixes(select), remove_prefixes(prefetch)
+
+
+def remove_prefixes(lookups):
+    """Drop lookups covered by longer ones: "a" by "a__b" """
+    return sorted(
+        lookup for lookup in lookups
+        if not any(other.startswith(f'{lookup}__') for other in lookups)
+    )
+
+
+def get_getter_value(instance, getter):
+    """Read a value through a custom getter
+
+    Arguments:
+        getter: function of the instance, or a dotted path of attributes,
+            methods (called without arguments) and list indexes,
+            e.g. "groups.all.-1" for the last of the instance's groups
+    """
+    if callable(getter):
+        return getter(instance)
+
+    value = instance
+    for part in getter.split('.'):
+        if value is None:
+            return None
+        if INDEX_REGEX.match(part):
+            # lists and prefetched querysets, without another query
+            values = list(value)
+            index = int(part)
+            value = values[index] if -len(values) <= index < len(values) else None
+            continue
+        value = getattr(value, part, None)
+        if callable(value) and not isinstance(value, BaseManager):
+            # related managers are callable, but only to switch managers
+            value = value()
+    return value
+
+
+def to_field_value(value):
+    """Render model instances as their primary keys"""
+    if isinstance(value, Model):
+        return value.pk
+    if isinstance(value, (QuerySet, list, tuple)):
+        return [to_field_value(v) for v in value]
+    return value
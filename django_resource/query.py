@@ -1,7 +1,8 @@
 from collections import defaultdict
-from urllib.parse import parse_qs
-from .utils import merge as _merge
-from copy import deepcopy
+from urllib.parse import parse_qs, parse_qsl, urlencode
+from .cache import LRUCache
+from .conf import get_setting
+from .utils import merged
 from .exceptions import QueryValidationError, QueryExecutionError
 from .features import (
     get_feature,
@@ -13,6 +14,7 @@ from .features import (
     TAKE,
     SORT,
 )
+from .where import NULL_OPERATORS, REFERENCE_SUFFIX, quote
 from .boolean import (
     build_expression,
     BOOLEAN_OPERATORS,
@@ -52,6 +54,39 @@ def coerce_query_value(value, singletons=True):
     return value
 
 
+def get_where_operand(operator, key, values):
+    """Build a where condition from querystring parts
+
+    Values are literals, unless the operator ends in "$":
+    then they name other fields.
+
+    Example:
+        where:name=Joe -> {"=": ["name", '"Joe"']}
+        where:name:=$=parent.name -> {"=": ["name", "parent.name"]}
+    """
+    # null:true and null:false are flags, other values are compared as given
+    singletons = operator in NULL_OPERATORS
+    values = coerce_query_values(values, singletons=singletons)
+    if operator.endswith(REFERENCE_SUFFIX):
+        return {operator[:-len(REFERENCE_SUFFIX)]: [key, values]}
+    return {operator: [key, quote(values)]}
+
+
+def canonicalize_querystring(value):
+    """Normalize parameter order so equivalent querystrings are equal
+
+    Parameters are sorted by key. The relative order of "where" parameters
+    within a level is preserved: their positions name their conditions.
+    """
+    def get_key(pair):
+        key = pair[0]
+        if get_feature(key) == WHERE:
+            return key.split(':')[0]
+        return key
+
+    return urlencode(sorted(parse_qsl(value), key=get_key))
+
+
 def coerce_query_values(values, singletons=True):
     single = isinstance(values, list) and len(values) == 1
     values = [coerce_query_value(value, singletons) for value in values]
@@ -59,6 +94,12 @@ def coerce_query_values(values, singletons=True):
 
 
 class Query(object):
+    # parsed querystring cache, created on first use
+    _cache = None
+    # whether parts of the state may be shared with other queries
+    # or the cache, so that they must not be changed in place
+    _shared = False
+
     # methods
     def __init__(self, state=None, executor=None):
         """
@@ -100,6 +141,11 @@ class Query(object):
     def state(self):
         return self._state
 
+    def get_feature(self, name):
+        """Get the server's settings for a feature, if there is an executor"""
+        executor = self.executor
+        return executor.get_feature(name) if executor else None
+
     # features
 
     def body(self, body):
@@ -215,14 +261,22 @@ class Query(object):
         return str(self.state)
 
     def _update(self, args=None, level=None, merge=False, copy=True, **kwargs):
+        """Update the state at a level
+
+        With copy=True, the current state is left untouched: only the dicts
+        on the path to the updated level are copied (path-copying), and all
+        other subtrees are shared between the old and new query.
+
+        With copy=False, this query is updated and returned. If its state
+        is shared (see _shared), the path is still copied first, so other
+        queries and the querystring cache never see the change.
+        """
         if args:
             kwargs = args
 
-        state = None
-        if copy:
-            state = deepcopy(self.state)
-        else:
-            state = self.state
+        shared = self._shared
+        copy_path = copy or shared
+        state = dict(self.state) if copy_path else self.state
 
         sub = state
         # adjust substate at particular level
@@ -230,33 +284,38 @@ class Query(object):
         take = 'take'
         if level:
             for part in level.split("."):
-                if take not in sub:
-                    sub[take] = {}
-
-                fields = sub[take]
-                try:
-                    new_sub = fields[part]
-                except KeyError:
-                    fields[part] = {}
-                    sub = fields[part]
-                else:
-                    if isinstance(new_sub, bool):
-                        fields[part] = {}
-                        sub = fields[part]
-                    else:
-                        sub = new_sub
+                fields = sub.get(take)
+                if not isinstance(fields, dict):
+                    fields = {}
+                elif copy_path:
+                    fields = dict(fields)
+                sub[take] = fields
+
+                new_sub = fields.get(part)
+                if not isinstance(new_sub, dict):
+                    # missing or boolean: replace with a new level
+                    new_sub = {}
+                elif copy_path:
+                    new_sub = dict(new_sub)
+                fields[part] = new_sub
+                sub = new_sub
 
         for key, value in kwargs.items():
             if merge and isinstance(value, dict) and sub.get(key):
-                # deep merge
-                _merge(value, sub[key])
+                # deep merge, copying only the merged paths
+                sub[key] = merged(value, sub[key])
             else:
                 # shallow merge, assign the state
                 sub[key] = value
 
         if copy:
-            return Query(state=state)
+            # both queries now hold the untouched subtrees
+            self._shared = True
+            query = Query(state=state, executor=self.executor)
+            query._shared = True
+            return query
         else:
+            self._state = state
             return self
 
     def __getitem__(self, key):
@@ -264,6 +323,8 @@ class Query(object):
 
     @classmethod
     def _update_where(cls, query, leveled):
+        where = query.get_feature(WHERE)
+        max_depth = where.get('max_depth') if isinstance(where, dict) else None
         for level, wheres in leveled.items():
             expression = 'and'
             operands = {}
@@ -287,24 +348,16 @@ class Query(object):
                 elif num_parts == 2:
                     # where:name=Joe
                     # -> {"name": "Joe"}
-                    operand = {
-                        '=': [where[0], coerce_query_values(where[1], singletons=False)]
-                    }
+                    operand = get_where_operand('=', where[0], where[1])
                     key = str(i)
                 elif num_parts == 3:
                     # where:name:equals=Joe
                     # -> {"equals": ["name", "Joe"]}}
-                    operand = {
-                        where[1]: [where[0], coerce_query_values(where[2], singletons=False)]
-                    }
+                    operand = get_where_operand(where[1], where[0], where[2])
                     key = str(i)
                 elif num_parts == 4:
                     # where:name:equals:tag=Joe
-                    operand = {
-                        where[1]: [
-                            where[0], coerce_query_values(where[3], singletons=False)
-                        ]
-                    }
+                    operand = get_where_operand(where[1], where[0], where[3])
                     key = where[2]
                     if key in BOOLEAN_OPERATORS:
                         raise QueryValidationError(
@@ -324,7 +377,9 @@ class Query(object):
             values = list(operands.values())
             if expression not in SIMPLE_EXPRESSIONS:
                 # expression specified, try to build it
-                update = build_expression(expression, operands)
+                update = build_expression(
+                    expression, operands, max_depth=max_depth
+                )
             else:
                 # no expression given, implicit AND
                 if len(values) == 1:
@@ -353,7 +408,8 @@ class Query(object):
             current = update[key]
             for i, part in enumerate(parts):
                 if i != num_parts - 1:
-                    current = current[part] = {}
+                    current[part] = {}
+                    current = current[part]
                 else:
                     current[part] = value
 
@@ -361,8 +417,59 @@ class Query(object):
             update[key] = value
         return update
 
+    @classmethod
+    def get_cache(cls):
+        """Get the LRU cache of parsed querystrings
+
+        Sized by DJANGO_RESOURCE["QUERY_CACHE_SIZE"]; hit and miss
+        counters are available through get_cache().info()
+        """
+        if Query._cache is None:
+            Query._cache = LRUCache(get_setting("QUERY_CACHE_SIZE"))
+        return Query._cache
+
     @classmethod
     def from_querystring(cls, value, **kwargs):
+        """Parse a querystring into a query
+
+        Parsed states are cached by canonical querystring, initial state
+        and where depth limit. Cached states are shared between the queries
+        returned, which copy them on update, even with copy=False.
+        """
+        cache = cls.get_cache()
+        key = None
+        if cache.size is None or cache.size > 0:
+            initial = kwargs.get('state') or {}
+            # parsing enforces the executor's where depth
+            executor = kwargs.get('executor')
+            where = executor.get_feature(WHERE) if executor else None
+            max_depth = where.get('max_depth') if isinstance(where, dict) else None
+            try:
+                key = (
+                    canonicalize_querystring(value),
+                    tuple(sorted(initial.items())),
+                    max_depth
+                )
+                hash(key)
+            except TypeError:
+                # initial state is not hashable, skip the cache
+                key = None
+
+        if key is not None:
+            state = cache.get(key)
+            if state is not None:
+                result = cls(**dict(kwargs, state=state))
+                result._shared = True
+                return result
+
+        result = cls._from_querystring(value, **kwargs)
+        if key is not None:
+            cache.set(key, result.state)
+            result._shared = True
+        return result
+
+    @classmethod
+    def _from_querystring(cls, value, **kwargs):
         result = cls(**kwargs)
         query = parse_qs(value)
         where = defaultdict(list)  # level -> [args]
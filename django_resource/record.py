@@ -0,0 +1,116 @@
+from functools import lru_cache
+from operator import itemgetter
+
+# number of distinct (resource, fields) record types kept
+RECORD_TYPE_CACHE_SIZE = 1024
+
+
+class Record(tuple):
+    """Compact, read-only record with values stored by field offset
+
+    Subclasses are made per resource and field list by get_record_type,
+    with one property per field. Records have no per-instance __dict__,
+    so they cost little more than a tuple of their values.
+
+    Field properties take precedence over methods of the same name
+    (e.g. a field "items"); call those through the class instead:
+    Record.items(record).
+
+    Example:
+        User = get_record_type("users", ("id", "name"))
+        user = User((1, "Joe"))
+        user.name == user["name"] == "Joe"
+        user == {"id": 1, "name": "Joe"}
+    """
+
+    __slots__ = ()
+    # underscored to leave attribute names free for fields
+    _resource = None
+    _fields = ()
+    _offsets = {}
+
+    def __new__(cls, values=()):
+        return tuple.__new__(cls, values)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get(field) for field in cls._fields)
+
+    def __getattr__(self, key):
+        try:
+            return tuple.__getitem__(self, self._offsets[key])
+        except KeyError:
+            raise AttributeError(f'{key} is not a field of {self._resource}')
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._offsets[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return Record.as_dict(self) == other
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self):
+        return f'({self._resource}: {Record.as_dict(self)})'
+
+    def __reduce__(self):
+        # record types are made at runtime, pickle by resource and fields
+        return make_record, (self._resource, self._fields, tuple(self))
+
+    def get(self, key, default=None):
+        offset = self._offsets.get(key)
+        return default if offset is None else tuple.__getitem__(self, offset)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def as_dict(self):
+        return dict(zip(self._fields, self))
+
+    def merge(self, other):
+        """Combine with another record of the same resource
+
+        Values from other take precedence.
+        """
+        if self._fields == other._fields:
+            return other
+        data = Record.as_dict(self)
+        data.update(Record.items(other))
+        return get_record_type(self._resource, tuple(data.keys())).from_dict(data)
+
+
+@lru_cache(maxsize=RECORD_TYPE_CACHE_SIZE)
+def get_record_type(name, fields):
+    """Get the record type for a resource name and tuple of fields"""
+    namespace = {
+        '__slots__': (),
+        '_resource': name,
+        '_fields': fields,
+        '_offsets': {field: i for i, field in enumerate(fields)},
+    }
+    for i, field in enumerate(fields):
+        if not field.startswith('_'):
+            # also shadows tuple and mapping methods, e.g. "count" or "items"
+            namespace[field] = property(itemgetter(i))
+    return type('Record', (Record,), namespace)
+
+
+def make_record(name, fields, values):
+    """Make a record from a resource name, tuple of fields and values"""
+    return get_record_type(name, fields)(values)
@@ -0,0 +1,220 @@
+import json
+from collections import OrderedDict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .executor import CHUNK_SIZE, merge_record
+from .record import Record
+
+
+class StreamingRenderer(object):
+    """Renders the normalized key/data response incrementally
+
+    Rows are written as they come off each level's server-side cursor,
+    so the response is never held in memory as a whole. Levels that
+    share a resource are written into the same "data" entry; only their
+    IDs are kept to skip duplicates, unless they take different fields:
+    then each record's renderings are merged in memory, as the executor
+    does, before the entry is written. The "key", "meta" and to-many link
+    maps ("posts.comments": {parent: [ids]}) hold IDs only and are
+    written last.
+    """
+
+    content_type = 'application/json'
+    encoder = DjangoJSONEncoder
+    # number of records per chunk written to the response
+    buffer_size = 100
+
+    def __init__(self, executor, chunk_size=CHUNK_SIZE):
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    def encode(self, value):
+        if isinstance(value, Record):
+            # tuples would otherwise encode as arrays
+            value = Record.as_dict(value)
+        return json.dumps(value, cls=self.encoder)
+
+    def get_response(self, query, identity=None, **kwargs):
+        return StreamingHttpResponse(
+            self.render(query, identity=identity),
+            content_type=self.content_type,
+            **kwargs
+        )
+
+    def render(self, query, identity=None):
+        """Get an iterator over the JSON response for query in chunks
+
+        The query is validated before this returns, so that invalid
+        queries raise here instead of after the response has started.
+        """
+        state = getattr(query, 'state', query)
+        roots = self.executor.get_levels(state)
+        levels = [level for root in roots for level in root.get_levels()]
+        for level in levels:
+            level.validate()
+        return self.render_levels(state, levels)
+
+    def render_levels(self, state, levels):
+        # resources of polymorphic links are written last, once the
+        # levels linking to them have collected their IDs
+        targets = OrderedDict()
+        for level in levels:
+            for target in level.get_link_targets():
+                targets[target] = True
+
+        # group record levels by resource to write each "data" key once
+        groups = OrderedDict()
+        for level in levels:
+            if level.take and level.name not in targets:
+                groups.setdefault(level.name, []).append(level)
+        for level in levels:
+            if level.take and level.name in targets:
+                groups.setdefault(level.name, []).append(level)
+        for target in targets:
+            groups.setdefault(target, [])
+
+        links = OrderedDict()  # level key -> {parent: [ids]}
+        data = {}  # root records, needed to build the key of field queries
+        buffer = ['{"data": {']
+        first = True
+        for name, group in groups.items():
+            separator = '' if first else ', '
+            header = f'{separator}{self.encode(name)}: {{'
+            # keys with only linked records are written from their first one
+            opened = bool(group)
+            if opened:
+                buffer.append(header)
+                first = False
+            seen = None
+            if len(group) != 1 or group[0].parent is not None or name in targets:
+                # the same record can be reached through many parents
+                seen = set()
+            empty = True
+            rows = self.fetch_group(name, group, levels, links)
+            if len(self.get_field_sets(name, group, levels)) > 1:
+                rows = self.merge_rows(rows)
+            for level, pk, record in rows:
+                if level and level.parent is None and state.get('field'):
+                    data.setdefault(level.name, {})[pk] = record
+                if seen is not None:
+                    if pk in seen:
+                        continue
+                    seen.add(pk)
+                if not opened:
+                    buffer.append(header)
+                    first = False
+                    opened = True
+                separator = '' if empty else ', '
+                buffer.append(
+                    f'{separator}{self.encode(str(pk))}: {self.encode(record)}'
+                )
+                empty = False
+                if len(buffer) >= self.buffer_size:
+                    yield ''.join(buffer)
+                    buffer = []
+            if opened:
+                buffer.append('}')
+
+        # levels that only render IDs
+        for level in levels:
+            if not level.take:
+                for _ in self.fetch(level, links):
+                    pass
+
+        for name, mapping in links.items():
+            separator = '' if first else ', '
+            buffer.append(
+                f'{separator}{self.encode(name)}: {self.encode(mapping)}'
+            )
+            first = False
+        buffer.append('}')
+
+        key = {}
+        page = {}
+        group = {}
+        for level in levels:
+            if level.cursor:
+                page[level.path] = {'next': level.cursor}
+            if level.group:
+                group[level.path] = level.group
+            if level.parent is None:
+                data.update(links)
+                key.update(
+                    self.executor.get_key(state, level, level.ids or [], data)
+                )
+        buffer.append(f', "key": {self.encode(key)}')
+        meta = self.executor.get_meta(page, group)
+        if meta:
+            buffer.append(f', "meta": {self.encode(meta)}')
+        buffer.append('}')
+        yield ''.join(buffer)
+
+    def get_field_sets(self, name, group, levels):
+        """Get the distinct sets of fields taken for one "data" key
+
+        Returns:
+            set of frozensets of field names, one per distinct set
+        """
+        takes = [level.take for level in group]
+        for level in levels:
+            if name in level.get_link_targets():
+                takes.append(level.get_link_take(name))
+        return {
+            frozenset(field for field, show in take.items() if show)
+            for take in takes
+        }
+
+    def merge_rows(self, rows):
+        """Merge the renderings of each record, keeping the first order
+
+        Yields:
+            (level, pk, record), where level is a root level if the
+            record was rendered by one
+        """
+        merged = OrderedDict()
+        for level, pk, record in rows:
+            current = merged.get(pk)
+            if current is None:
+                merged[pk] = [level, record]
+                continue
+            if level is not None and level.parent is None:
+                current[0] = level
+            current[1] = merge_record(current[1], record)
+        for pk, (level, record) in merged.items():
+            yield level, pk, record
+
+    def fetch_group(self, name, group, levels, links):
+        """Stream the records of one "data" key
+
+        Rows of the group's levels come first, then the records of
+        polymorphic links to the resource from levels fetched so far.
+
+        Yields:
+            (level, pk, record), where level is None for linked records
+        """
+        for level in group:
+            for pk, record, _ in self.fetch(level, links):
+                yield level, pk, record
+        for level in levels:
+            for records in level.fetch_links([name]).values():
+                for pk, record in records.items():
+                    yield None, pk, record
+
+    def fetch(self, level, links):
+        """Stream a level's rows, collecting its to-many link map"""
+        parent = level.parent
+        if parent is not None and parent.count == 0:
+            # no rows above this level means nothing to fetch
+            return
+
+        mapping = None
+        if level.link is not None and level.link.many:
+            mapping = links.setdefault(level.key, {})
+        for pk, record, parent_pk in level.fetch(
+            stream=True, chunk_size=self.chunk_size
+        ):
+            if mapping is not None:
+                mapping.setdefault(parent_pk, []).append(pk)
+            yield pk, record, parent_pk
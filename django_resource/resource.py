@@ -3,6 +3,59 @@ from .utils import as_dict, cached_property
 from .store import Store
 
 
+class SchemaTable(object):
+    """Schema of a Resource class, precomputed once per class
+
+    Attributes:
+        fields: field name -> field schema
+        order: field names in definition order
+        id_field: name of the primary field, or None
+        links: names of link fields
+        lists: names of list fields
+        defaults: field name -> default value
+        plain: names of fields read straight from options: not links,
+            no source and no computed default
+        validators: field name -> compiled type validator
+        meta: Schema attributes, as returned by Resource.get_meta()
+    """
+
+    def __init__(self, resource):
+        from .types import compile_type, is_link, is_list
+
+        fields = resource.get_fields()
+        self.fields = fields
+        self.order = tuple(fields.keys())
+        self.id_field = None
+        self.links = set()
+        self.lists = set()
+        self.defaults = {}
+        self.plain = set()
+        self.validators = {}
+        for name, field in fields.items():
+            if not isinstance(field, dict):
+                # shorthand, resolved by the store on first use
+                continue
+
+            type = field.get("type")
+            if self.id_field is None and field.get("primary", False):
+                self.id_field = name
+            if is_link(type):
+                self.links.add(name)
+            if is_list(type):
+                self.lists.add(name)
+            default = field.get("default")
+            self.defaults[name] = default
+            self.validators[name] = compile_type(type)
+            if (
+                name not in self.links
+                and not field.get("source")
+                and not callable(default)
+                and not isinstance(default, dict)
+            ):
+                self.plain.add(name)
+        self.meta = as_dict(resource.Schema)
+
+
 class Resource(object):
     class Schema:
         id = "resources"
@@ -161,6 +214,13 @@ class Resource(object):
         if key.startswith("_"):
             return self.__dict__.get(key, None)
 
+        table = self.get_schema_table()
+        if key in table.plain and key not in self._fields:
+            # read straight from options without setting up a field
+            value = self.get_option(key, table.defaults[key])
+            table.validators[key](value)
+            return value
+
         return self.get_field(key).get_value()
 
     def __setattr__(self, key, value):
@@ -196,6 +256,9 @@ class Resource(object):
     def add(self, key, value, index=None):
         return self._get_property(key).add_value(value, index=index)
 
+    def remove(self, key, value):
+        return self._get_property(key).remove_value(value)
+
     def get_property(self, key=None):
         return self._get_property(key).get_value(resolve=False, id=True)
 
@@ -219,10 +282,75 @@ class Resource(object):
     def get_fields(cls):
         return cls.Schema.fields
 
+    @classmethod
+    def get_schema_table(cls):
+        # stored on each class itself, never inherited from a base class
+        table = cls.__dict__.get("_schema_table")
+        if table is None:
+            table = SchemaTable(cls)
+            cls._schema_table = table
+        return table
+
+    @classmethod
+    def get_record_type(cls):
+        """Get the compact Record type for this resource's fields"""
+        from .record import get_record_type
+
+        return get_record_type(cls.get_meta('id'), tuple(cls.get_fields().keys()))
+
+    def validate_records(self, records):
+        """Validate a batch of records against this resource's field types
+
+        Shorthand fields ("email": "email") are typed by the store,
+        e.g. from the Django model of the resource.
+
+        Returns:
+            dict of row index -> {field name: error message},
+            empty if all records are valid
+        """
+        from .types import validate_records
+
+        return validate_records(self.get_field_types(), records)
+
+    def get_field_types(self):
+        """Get the type of each field of this resource's records
+
+        Returns:
+            dict of field name -> type, or None if unknown
+        """
+        from .introspection import get_model_schema
+
+        fields = self.get_option("fields") or {}
+        if fields == "*":
+            model = self.data.resolver.model
+            fields = list(get_model_schema(model).fields) if model else []
+        if isinstance(fields, (list, tuple)):
+            # names, or field IDs like "{resource}.{name}"
+            prefix = f"{self.get_option('id')}."
+            names = [
+                name[len(prefix):] if name.startswith(prefix) else name
+                for name in fields
+            ]
+            fields = {name: name for name in names}
+
+        types = {}
+        for name, field in fields.items():
+            if isinstance(field, dict):
+                if "type" in field:
+                    types[name] = field["type"]
+                    continue
+                field = field.get("source", name)
+            # shorthand or computed source: resolve by the store if possible
+            types[name] = (
+                self.data.get_schema(field).get("type")
+                if isinstance(field, str) else None
+            )
+        return types
+
     def get_field(self, key):
         from .field import Field
 
-        fields = self.get_fields()
+        fields = self.get_schema_table().fields
         if key not in self._fields:
             if key not in fields:
                 this = str(self)
@@ -232,7 +360,7 @@ class Resource(object):
             if not isinstance(schema, dict):
                 # shorthand where source field name is given as the only argument
                 # in this case, use the store (e.g. DjangoStore) to determine the schema
-                schema = self.data.get_schema_for(schema)
+                schema = self.data.get_schema(schema)
 
             resource_id = self.get_meta('id')
             id = f"{resource_id}.{key}"
@@ -256,15 +384,10 @@ class Resource(object):
         return Resource(**options)
 
     def get_id_field(self):
-        if getattr(self, "_id_field", None):
-            return self._id_field
-
-        for name, field in self.get_fields().items():
-            if isinstance(field, dict) and field.get("primary", False):
-                self._id_field = name
-                return name
-
-        raise ValueError(f"Resource {self.name} has no primary key")
+        id_field = self.get_schema_table().id_field
+        if id_field is None:
+            raise ValueError(f"Resource {self.name} has no primary key")
+        return id_field
 
     def get_id(self):
         id_field = self.get_id_field()
@@ -277,16 +400,9 @@ class Resource(object):
     @classmethod
     def get_meta(cls, key=None, default=None):
         if not key:
-            return as_dict(cls.Schema)
+            return dict(cls.get_schema_table().meta)
         return getattr(cls.Schema, key, default)
 
-    def get_urlpatterns(self):
-        """Get Django urlpatterns for this resource"""
-        base = f'{self.space.server.url}/{self.space.name}/{self.name}'
-        patterns = [base]
-        for field in self.get_fields().keys():
-            patterns.append(f'{base}/{field}')
-
 
 def is_resolved(x):
     if isinstance(x, Resource):
@@ -0,0 +1,166 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+
+from .exceptions import QueryExecutionError, QueryValidationError
+from .query import Query
+from .renderer import StreamingRenderer
+
+# HTTP method -> query method
+METHODS = {
+    'GET': 'get',
+    'POST': 'add',
+    'PUT': 'set',
+    'PATCH': 'edit',
+    'DELETE': 'delete',
+    'OPTIONS': 'options',
+}
+# query methods that read a request body
+BODY_METHODS = {'add', 'set', 'edit'}
+
+
+class Router(object):
+    """Routes all requests for a server through one view
+
+    Paths have up to four segments: /{space}/{resource}/{record}/{field}.
+    Space and resource names are looked up in a table built once, so the
+    cost of routing does not grow with the number of resources or fields.
+
+    Arguments:
+        server: Server
+        routes: route table as returned by get_routes,
+            built from the server if not given
+    """
+
+    def __init__(self, server, routes=None):
+        self.server = server
+        self.spaces = {
+            space.name: space for space in server.spaces if space.name != '.'
+        }
+        if routes is None:
+            routes = self.get_routes(server)
+        self.routes = {
+            space: frozenset(resources) for space, resources in routes.items()
+        }
+
+    @classmethod
+    def get_routes(cls, server):
+        """Get the route table
+
+        Returns:
+            dict of space name -> sorted list of resource names
+        """
+        return {
+            space.name: sorted(
+                resource.get_option('name') for resource in space.resources or []
+            )
+            for space in server.spaces
+            if space.name != '.'
+        }
+
+    def resolve(self, path):
+        """Resolve a request path
+
+        Returns:
+            (space, resource, record, field), where resource, record and
+            field are names or None if not in the path
+        Raises:
+            Http404 if the path does not match a space or resource
+        """
+        parts = [part for part in path.split('/') if part]
+        if not parts or len(parts) > 4:
+            raise Http404(f'Invalid path "{path}"')
+
+        space = self.spaces.get(parts[0])
+        resources = self.routes.get(parts[0])
+        if space is None or resources is None:
+            raise Http404(f'Invalid space "{parts[0]}"')
+
+        parts.extend([None] * (4 - len(parts)))
+        _, resource, record, field = parts
+        if resource is not None and resource not in resources:
+            raise Http404(f'Invalid resource "{resource}"')
+        return space, resource, record, field
+
+    def get_query(self, request, path):
+        """Get the query for a request
+
+        Returns:
+            Query, or None if the request method is not supported
+            by the space's executor
+        """
+        method = METHODS.get(request.method)
+        if method is None:
+            return None
+
+        space, resource, record, field = self.resolve(path)
+        executor = space.data.executor
+        if not callable(getattr(executor, method, None)):
+            return None
+
+        state = {'.space': space.name}
+        if resource:
+            state['.resource'] = resource
+
+        querystring = request.META.get('QUERY_STRING')
+        if querystring:
+            query = Query.from_querystring(
+                querystring, state=state, executor=executor
+            )
+        else:
+            query = Query(state=state, executor=executor)
+
+        if record is not None:
+            query = query.record(self.get_record_key(space, resource, record))
+        if field is not None:
+            query = query.field(field)
+        query = query.method(method)
+
+        if method in BODY_METHODS and request.body:
+            try:
+                body = json.loads(request.body)
+            except ValueError:
+                raise QueryValidationError('Invalid JSON body')
+            query = query.body(body)
+        return query
+
+    def get_record_key(self, space, resource, record):
+        """Convert a record key from a path to its primary key type
+
+        Raises:
+            Http404 if the key is not valid for the resource's model
+        """
+        executor = space.data.executor
+        try:
+            model = executor.get_model(executor.get_resource(resource, throw=True))
+        except QueryExecutionError:
+            # not backed by a model: keys are used as given
+            return record
+        try:
+            return model._meta.pk.to_python(record)
+        except (ValidationError, ValueError):
+            raise Http404(f'Invalid {resource} key "{record}"')
+
+    def get_allowed_methods(self, path):
+        """Get the HTTP methods supported by the executor of a path's space"""
+        executor = self.resolve(path)[0].data.executor
+        return [
+            name for name, method in METHODS.items()
+            if callable(getattr(executor, method, None))
+        ]
+
+    def dispatch(self, request, path=''):
+        """View for all resource requests"""
+        try:
+            query = self.get_query(request, path)
+            if query is None:
+                return HttpResponseNotAllowed(self.get_allowed_methods(path))
+            if query.state.get('method') == 'get':
+                return StreamingRenderer(query.executor).get_response(query)
+            return JsonResponse(query.execute(), encoder=DjangoJSONEncoder)
+        except QueryValidationError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        except QueryExecutionError as e:
+            return JsonResponse({'error': str(e)}, status=500)
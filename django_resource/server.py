@@ -1,4 +1,5 @@
 from django.utils.functional import cached_property
+from .conf import get_setting
 from .resource import Resource
 from .version import version
 
@@ -321,32 +322,81 @@ Response:
         )
 
     def setup(self):
+        """Build the meta-graph: the root space and the base types"""
+        from .field import defer_inverses
+
         if not self._setup:
-            self.add("spaces", self.root)
-            self.add("types", [
-                "any",
-                "null",
-                "string",
-                "number",
-                "boolean",
-                "type",
-                "link",
-                "union",
-                "map",
-                "tuple",
-                "object",
-                "option",
-                "array",
-            ])
+            # queue inverse links, then apply them in one batch per field
+            with defer_inverses():
+                self.add("spaces", self.root)
+                self.add("types", [
+                    "any",
+                    "null",
+                    "string",
+                    "number",
+                    "boolean",
+                    "type",
+                    "link",
+                    "union",
+                    "map",
+                    "tuple",
+                    "object",
+                    "option",
+                    "array",
+                ])
         self._setup = True
 
+    def load_snapshot(self, path):
+        """Use a schema snapshot compiled by the resource_snapshot command
+
+        The snapshot is checked against the declared options only
+        (see snapshot.get_definition), without running setup.
+
+        Returns:
+            True if loaded, False if the snapshot is missing or does not
+            match the current code, in which case the schema is built as usual
+        """
+        from .snapshot import read_snapshot
+
+        snapshot = self._snapshot = read_snapshot(self, path)
+        # rebuild the router from the snapshot's routes or the code
+        self.__dict__.pop("router", None)
+        return snapshot is not None
+
+    def get_compiled_fields(self, space, resource):
+        """Get a resource's field specs from the loaded snapshot
+
+        Returns:
+            dict of name -> spec, or None if not compiled
+        """
+        snapshot = self._snapshot
+        if not snapshot:
+            return None
+        return snapshot["spaces"].get(space, {}).get(resource, {}).get("fields")
+
+    @cached_property
+    def router(self):
+        from .router import Router
+
+        path = get_setting("SNAPSHOT")
+        if self._snapshot is None and path:
+            self.load_snapshot(path)
+        snapshot = self._snapshot
+        if snapshot is None:
+            # no matching snapshot: build everything from the code
+            self.setup()
+            return Router(self)
+        return Router(self, routes=snapshot["routes"])
+
     @cached_property
     def urlpatterns(self):
         return self.get_urlpatterns()
 
     def get_urlpatterns(self):
-        patterns = []
-        self.setup()
-        for space in self.spaces:
-            patterns.extend(space.get_urlpatterns())
-        return patterns
+        """Get Django urlpatterns: one view that routes all requests"""
+        from django.urls import re_path
+
+        return [re_path(r"^/?(?P<path>.*)$", self.dispatch, name="resources")]
+
+    def dispatch(self, request, path=""):
+        return self.router.dispatch(request, path)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+
+import django
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import __version__
+from .resource import Resource
+from .router import Router
+
+# bumped when the snapshot layout changes
+SNAPSHOT_VERSION = 1
+# options that link back into the meta-graph
+LINK_OPTIONS = {'space', 'server', 'parent', 'resources'}
+
+
+def get_value_definition(value):
+    """Get a stable, JSON-serializable form of an option value"""
+    if isinstance(value, Resource):
+        return value.get_id()
+    if isinstance(value, dict):
+        return {str(k): get_value_definition(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [get_value_definition(v) for v in value]
+    if callable(value):
+        # the same function in another process
+        name = getattr(value, '__qualname__', type(value).__qualname__)
+        return f'{value.__module__}.{name}'
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def get_options(resource):
+    """Get the declared options of a resource, space or server"""
+    return {
+        key: get_value_definition(value)
+        for key, value in resource._options.items()
+        if key not in LINK_OPTIONS
+    }
+
+
+def get_model_definition(source):
+    """Get the database fields of a declared model source
+
+    Returns:
+        list of [name, internal type, null], or None if source
+        is not a model
+    """
+    if not isinstance(source, str):
+        return None
+    try:
+        model = apps.get_model(source)
+    except (LookupError, ValueError):
+        return None
+    meta = model._meta
+    return [
+        [field.name, field.get_internal_type(), field.null]
+        for field in list(meta.concrete_fields) + list(meta.many_to_many)
+    ]
+
+
+def get_definition(server):
+    """Get what the compiled schema depends on, cheaply
+
+    This is the package and Django versions, the options declared on
+    the server, its spaces and their resources, and the fields of the
+    resources' models. Options are read as given and models through
+    Model._meta: the meta-graph (Server.setup) is not built, so that
+    checking a snapshot costs little at startup.
+    """
+    spaces = {}
+    models = {}
+    for space in server.spaces or []:
+        if space.name == '.':
+            continue
+        resources = {}
+        for resource in space.resources or []:
+            options = get_options(resource)
+            resources[resource.get_option('name')] = options
+            source = options.get('source') or options.get('model')
+            if isinstance(source, str) and source not in models:
+                models[source] = get_model_definition(source)
+        spaces[space.name] = {
+            'options': get_options(space),
+            'resources': resources,
+        }
+    options = get_options(server)
+    options.pop('spaces', None)
+    return {
+        'package': __version__,
+        'django': list(django.VERSION),
+        'server': options,
+        'spaces': spaces,
+        'models': models,
+    }
+
+
+def get_fingerprint(server):
+    """Hash the server definition to check snapshots against the code"""
+    definition = json.dumps(get_definition(server), sort_keys=True)
+    return hashlib.sha256(definition.encode('utf-8')).hexdigest()
+
+
+def compile_fields(resource, executor):
+    """Resolve a resource's field specs as the executor would use them
+
+    Shorthand fields ("email": "email") are expanded to full schemas.
+
+    Returns:
+        dict of name -> spec, or None if the specs cannot be stored
+        (for example, if they contain functions)
+    """
+    source = executor.get_source(resource)
+    if not isinstance(source, str) or '.' not in source.strip('.'):
+        return None
+
+    model = executor.get_model(resource)
+    resolver = resource.data.resolver
+    fields = {}
+    for name, spec in executor.get_fields(resource, model).items():
+        if set(spec.keys()) == {'source'}:
+            spec = resolver.get_schema(spec['source'], model)
+        fields[name] = spec
+
+    try:
+        return json.loads(json.dumps(fields, cls=DjangoJSONEncoder))
+    except TypeError:
+        return None
+
+
+def compile_snapshot(server):
+    """Compile a server's schema into a JSON-serializable snapshot
+
+    Returns:
+        dict with version, fingerprint, spaces and routes
+    """
+    server.setup()
+    # always build from the code, never from a loaded snapshot
+    server._snapshot = None
+    spaces = {}
+    for space in server.spaces:
+        if space.name == '.':
+            continue
+        executor = space.data.executor
+        spaces[space.name] = {
+            resource.name: {'fields': compile_fields(resource, executor)}
+            for resource in space.resources or []
+        }
+    return {
+        'version': SNAPSHOT_VERSION,
+        'fingerprint': get_fingerprint(server),
+        'spaces': spaces,
+        'routes': Router.get_routes(server),
+    }
+
+
+def write_snapshot(server, path):
+    snapshot = compile_snapshot(server)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # write then move, so that readers never see a partial file
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(snapshot, file, cls=DjangoJSONEncoder, sort_keys=True)
+    os.replace(temporary, path)
+    return snapshot
+
+
+def read_snapshot(server, path):
+    """Read a snapshot if it matches the server's current code
+
+    Returns:
+        snapshot dict, or None if the file is missing, invalid,
+        from another version or for a different definition
+    """
+    try:
+        with open(path) as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    if snapshot.get('fingerprint') != get_fingerprint(server):
+        return None
+    return snapshot
@@ -1,5 +1,7 @@
+from .cache import LocalRecordCache, get_record_cache
+from .exceptions import RecordNotFoundError
 from .resource import Resource
-from .types import get_link, get_type_name, get_type_names
+from .types import get_link, get_type_name, get_type_names, get_type_property
 from decimal import Decimal
 
 
@@ -52,69 +54,129 @@ class Space(Resource):
         # ...for "resources" (e.g. "resources", "spaces")
         # ...for "server" (e.g. "server")
         # ...for "types" (e.g. "any", "integer", "object")
-        self._records = {}
+        if kwargs.get("name") == ".":
+            # meta-records are few and must keep their identity: never evict
+            self._records = LocalRecordCache(namespace=".", size=None)
+        else:
+            self._records = get_record_cache(kwargs.get("name"))
         return super(Space, self).__init__(**kwargs)
 
     def resolve_record(self, name, key):
+        """Resolve one record of a resource
+
+        Raises:
+            RecordNotFoundError if there is no record with the key
+        """
         from .types import Type
         from .field import Field
 
-        if self.name == '.':
-            if name == 'server':
-                return self.server
-            if name == 'spaces':
-                if key == self.name:
-                    return self
-                else:
-                    raise Exception(f'Invalid {name} key: {key}')
-            if name == 'resources':
-                if key == 'server':
-                    return self.server.as_record(space=self)
-                if key == 'spaces':
-                    return Space.as_record(space=self)
-                if key == 'fields':
-                    return Field.as_record(space=self)
-                if key == 'types':
-                    return Type.as_record(space=self)
-                if key == 'resources':
-                    return Resource.as_record(space=self)
-                raise Exception(f'Invalid {name} key: {key}')
-            if name == 'types':
-                return Type.get_base_type(
-                    key,
-                    server=self.server
-                )
-            if name == 'fields':
-                parts = key.split('.')
-                resource_id = '.'.join(parts[0:-1])
-                field_name = parts[-1]
-                # todo: get field schema
-                return Field(
-                    id=key,
-                    parent=self,
-                    name=field_name,
-                    resource=resource_id,
-                )
-            raise Exception(f'Invalid resource: {name}')
+        if self.name != '.':
+            record = self.resolve_records(name, [key]).get(key)
+            if record is None:
+                raise RecordNotFoundError(f'Invalid {name} key: {key}')
+            return record
+
+        if name == 'server':
+            return self.server
+        if name == 'spaces':
+            if key == self.name:
+                return self
+            else:
+                raise RecordNotFoundError(f'Invalid {name} key: {key}')
+        if name == 'resources':
+            if key == 'server':
+                return self.server.as_record(space=self)
+            if key == 'spaces':
+                return Space.as_record(space=self)
+            if key == 'fields':
+                return Field.as_record(space=self)
+            if key == 'types':
+                return Type.as_record(space=self)
+            if key == 'resources':
+                return Resource.as_record(space=self)
+            raise RecordNotFoundError(f'Invalid {name} key: {key}')
+        if name == 'types':
+            return Type.get_base_type(
+                key,
+                server=self.server
+            )
+        if name == 'fields':
+            parts = key.split('.')
+            resource_id = '.'.join(parts[0:-1])
+            field_name = parts[-1]
+            # todo: get field schema
+            return Field(
+                id=key,
+                parent=self,
+                name=field_name,
+                resource=resource_id,
+            )
+        raise Exception(f'Invalid resource: {name}')
 
     # e.g. "spaces" "."
     def resolve_link(self, name, key, throw=True):
-        records = self._records.get(name)
-        if not records:
-            records = self._records[name] = {}
-
-        record = records.get(key, None)
-        if not record:
+        record = self._records.get(name, key)
+        if record is None:
             try:
-                record = records[key] = self.resolve_record(name, key)
+                record = self.resolve_record(name, key)
             except Exception:
                 if throw:
                     raise
                 else:
                     # silently return None
                     return None
+            self._records.set(name, key, record)
         return record
 
+    def resolve_records(self, name, keys):
+        """Resolve many records of one resource at once
+
+        The root space resolves its meta-records one by one, other spaces
+        fetch all records with one query through the store's executor.
+
+        Returns:
+            dict of key -> record, missing keys are left out
+        """
+        if self.name == '.':
+            records = {}
+            for key in keys:
+                try:
+                    records[key] = self.resolve_record(name, key)
+                except RecordNotFoundError:
+                    pass
+            return records
+        return self.data.executor.get_records(name, keys)
+
+    def resolve_links(self, name, keys, throw=True):
+        """Resolve a list of links to the same resource in bulk
+
+        Cached records are used first; the rest are resolved in one pass.
+
+        Returns:
+            list of records in the order of keys
+            (None for missing records if not throw)
+        """
+        unique = list(dict.fromkeys(keys))
+        records = self._records.get_many(name, unique)
+        missing = [key for key in unique if key not in records]
+        if missing:
+            resolved = self.resolve_records(name, missing)
+            if throw and len(resolved) < len(missing):
+                invalid = ', '.join(str(k) for k in missing if k not in resolved)
+                raise RecordNotFoundError(f'Invalid {name} keys: {invalid}')
+            self._records.set_many(name, resolved)
+            records.update(resolved)
+        return [records.get(key) for key in keys]
+
+    def invalidate(self, name=None, key=None):
+        """Drop cached records after they change
+
+        Arguments:
+            name: resource name, None for all resources
+            key: record key, None for all records of the resource
+        """
+        self._records.invalidate(name, key)
+
     def resolve(self, T, value, throw=True):
         name = get_type_name(T)
         names = get_type_names(T)
@@ -137,7 +199,13 @@ class Space(Resource):
                         raise ValueError(f'Failed to resolve: {value} not an object')
                     return value
                 items = get_type_property(T, 'items')
-                if items:
+                items_name = get_type_name(items)
+                if items_name and items_name.startswith('@'):
+                    # list of links to one resource: resolve in bulk
+                    value = self.resolve_links(
+                        get_link(items_name), value, throw=throw
+                    )
+                elif items:
                     value = [self.resolve(items, v, throw=throw) for v in value]
             elif name.startswith('@'):
                 link = get_link(name)
@@ -157,11 +225,14 @@ class Space(Resource):
                     if throw:
                         raise ValueError(f'Failed to resolve: {value} not a number')
                     return value
+        if not names and isinstance(T, dict):
+            # e.g. polymorphic links: {"anyOf": ["@posts", "@comments"]}
+            names = get_type_property(T, 'anyOf') or get_type_property(T, 'oneOf')
         if names:
             for name in names:
                 try:
                     val = self.resolve(name, value, throw=True)
-                except ValueError:
+                except (ValueError, RecordNotFoundError):
                     # does not match this schema
                     continue
                 else:
@@ -172,9 +243,3 @@ class Space(Resource):
                     f'Failed to resolve: {value} does not match any of {names}'
                 )
         return value
-
-    def get_urlpatterns(self):
-        patterns = []
-        for resource in self.resources:
-            patterns.extend(resource.get_urlpatterns())
-        return patterns
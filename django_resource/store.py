@@ -5,14 +5,24 @@ from .query import Query
 class SchemaResolver(object):
     def __init__(self, resource):
         self.resource = resource
+        # (model, source) -> schema
+        self._schemas = {}
 
-    def get_schema(self, source):
-        schema = {"source": source}
-        model = getattr(self, "model", None)
+    def get_schema(self, source, model=None):
+        if model is None:
+            model = getattr(self, "model", None)
 
         if not model:
-            return schema
+            return {"source": source}
+
+        key = (model, source)
+        schema = self._schemas.get(key)
+        if schema is None:
+            schema = self._schemas[key] = self.make_schema(source, model)
+        return dict(schema)
 
+    def make_schema(self, source, model):
+        schema = {"source": source}
         schema["type"] = self.get_type(source, model)
         schema["default"] = self.get_default(source, model)
         schema["choices"] = self.get_choices(source, model)
@@ -23,53 +33,70 @@ class SchemaResolver(object):
 
 
 class DjangoSchemaResolver(SchemaResolver):
-    @classmethod
+    """Resolves field schemas from Django models
+
+    Introspection results are shared per model through get_model_schema;
+    relations resolve to links when the related model has a resource
+    in the same space.
+    """
+
+    def get_field(self, source, model):
+        from .introspection import get_model_schema
+
+        return get_model_schema(model).get(source) or {}
+
     def get_type(self, source, model):
-        pass
+        field = self.get_field(source, model)
+        if not field:
+            return "any"
+
+        related_model = field["related_model"]
+        resource = self.get_resource_for(related_model) if related_model else None
+        if resource is None:
+            return field["type"]
+
+        link = f"@{resource.get_option('name')}"
+        if field["many"]:
+            return {"type": "array", "items": link}
+        return ["null", link] if field["null"] else link
+
+    def get_default(self, source, model):
+        return self.get_field(source, model).get("default")
 
-    @classmethod
     def get_choices(self, source, model):
-        pass
+        return self.get_field(source, model).get("choices")
+
+    def get_description(self, source, model):
+        return self.get_field(source, model).get("description")
 
-    @classmethod
-    def get_description(self):
-        pass
+    def get_unique(self, source, model):
+        return self.get_field(source, model).get("unique", False)
+
+    def get_index(self, source, model):
+        return self.get_field(source, model).get("index", False)
+
+    def get_resource_for(self, model):
+        resource = self.resource
+        space = resource if resource.__class__.__name__ == 'Space' else resource.space
+        return space.data.executor.get_resource_for(model)
 
     @cached_property
     def model(self):
         return self.get_model()
 
     def get_model(self):
-        if self.resource.source:
+        source = self.resource.get_option("source")
+        if isinstance(source, str) and "." in source.strip("."):
             # resolve model at this time if provided, throwing an error
             # if it does not exist or if Django is not imported
             from django.apps import apps
 
-            app_label, model_name = self.source.split(".")
+            app_label, model_name = source.split(".")
             return apps.get_model(app_label=app_label, model_name=model_name)
         else:
             return None
 
 
-class Executor(object):
-    """Executes Query, returns dict response"""
-
-    def __init__(self, resource, **kwargs):
-        self.resource = resource
-
-    def get(self, query, identity=None):
-        """
-            Arguments:
-                query: query dict
-                identity: user identity dict
-        """
-        pass
-
-
-class DjangoExecutor(Executor):
-    pass
-
-
 class Store(object):
     def __init__(self, resource):
         if resource.__class__.__name__ == 'Space':
@@ -79,10 +106,12 @@ class Store(object):
             self.resource = resource
             self.space = resource.space
 
-        self.resolver = self.get_resolver(self.space)
+        self.resolver = self.get_resolver(self.resource or self.space)
         self.executor = self.get_executor(self.space)
 
     def get_executor(self, space):
+        from .executor import DjangoExecutor
+
         return DjangoExecutor(space)
 
     @property
@@ -109,8 +138,8 @@ class Store(object):
                 executor=executor
             )
 
-    def get_resolver(self, space):
-        return DjangoSchemaResolver(space)
+    def get_resolver(self, resource):
+        return DjangoSchemaResolver(resource)
 
-    def get_schema(self, source):
-        return self.resolver.get_schema(source)
+    def get_schema(self, source, model=None):
+        return self.resolver.get_schema(source, model=model)
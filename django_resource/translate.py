@@ -0,0 +1,166 @@
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    F,
+    FloatField,
+    IntegerField,
+    Value,
+    When,
+)
+from django.db.models.functions import Concat
+
+from .exceptions import QueryValidationError
+from .features import WHERE
+from .introspection import get_model_field, get_model_schema, to_lookup
+from .where import WherePath, compile_where, is_quoted
+
+# Python type -> output field of literal values
+VALUE_FIELDS = (
+    (bool, BooleanField),
+    (int, IntegerField),
+    (float, FloatField),
+    (str, CharField),
+)
+# default separator of join expressions
+SEPARATOR = ' '
+
+
+class Untranslatable(Exception):
+    """Raised for source expressions that have no database equivalent"""
+
+
+def get_value(value):
+    """Get a literal as a database expression"""
+    for type, field in VALUE_FIELDS:
+        if isinstance(value, type):
+            return Value(value, output_field=field())
+    if value is None:
+        return Value(None)
+    raise Untranslatable(f'Invalid literal "{value}"')
+
+
+class SourceTranslator(object):
+    """Translates computed field sources into Django database expressions
+
+    Supported sources:
+        "first_name": a model field, as F("first_name")
+        '"Mr."', 1, True, {"value": "Mr."}: literals, as Value(...)
+        {"get": "profile.city"}: a model field path
+        {"join": {"items": [...], "separator": " "}}: Concat(...)
+        {"case": [{"when": where, "then": ...}, {"else": ...}]}: Case(...)
+
+    "when" conditions are where trees over model field paths.
+    Any other source, such as a template or a model attribute that is not
+    a field, is untranslatable and left to the Python evaluator.
+
+    Arguments:
+        model: model the source is evaluated against
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.schema = get_model_schema(model)
+
+    def translate(self, source):
+        """Get a database expression for a source
+
+        Raises:
+            Untranslatable
+        """
+        if isinstance(source, str):
+            if is_quoted(source):
+                return get_value(source[1:-1])
+            if not source:
+                return get_value(source)
+            return self.get_where_reference(source)
+        if not isinstance(source, dict):
+            return get_value(source)
+        if len(source) != 1:
+            raise Untranslatable(f'Invalid source "{source}"')
+
+        method, args = next(iter(source.items()))
+        method = method.lstrip('.')
+        if method == 'value':
+            return get_value(args)
+        if method == 'get' and isinstance(args, str):
+            return self.get_where_reference(args)
+        if method == 'join':
+            return self.translate_join(args)
+        if method == 'case':
+            return self.translate_case(args)
+        raise Untranslatable(f'Invalid source method "{method}"')
+
+    def translate_join(self, args):
+        separator = SEPARATOR
+        if isinstance(args, dict):
+            items = args.get('items', args.get('values'))
+            separator = args.get('separator', SEPARATOR)
+        else:
+            items = args
+        if not isinstance(items, list) or not items:
+            # e.g. joining an array attribute
+            raise Untranslatable(f'Invalid join "{args}"')
+
+        expressions = []
+        for i, item in enumerate(items):
+            if i and separator:
+                expressions.append(get_value(separator))
+            expressions.append(self.translate(item))
+        if len(expressions) == 1:
+            return expressions[0]
+        return Concat(*expressions, output_field=CharField())
+
+    def translate_case(self, args):
+        if not isinstance(args, list):
+            raise Untranslatable(f'Invalid case "{args}"')
+
+        whens = []
+        default = None
+        for clause in args:
+            if not isinstance(clause, dict):
+                raise Untranslatable(f'Invalid case "{args}"')
+            if 'else' in clause:
+                default = self.translate(clause['else'])
+                continue
+            if 'when' not in clause or 'then' not in clause:
+                raise Untranslatable(f'Invalid case "{args}"')
+            try:
+                condition = compile_where(clause['when'], self)
+            except QueryValidationError as e:
+                raise Untranslatable(str(e))
+            whens.append(When(condition, then=self.translate(clause['then'])))
+        if not whens:
+            return default if default is not None else get_value(None)
+        return Case(*whens, default=default)
+
+    def get_where_path(self, path, feature=WHERE):
+        """Resolve a model field path, for "when" conditions"""
+        schema = self.schema.get(path)
+        if schema is None:
+            raise Untranslatable(f'Invalid source field "{path}"')
+
+        lookup = to_lookup(path)
+        if schema['related_model'] is not None:
+            return WherePath(lookup, link=True, many=schema['many'])
+        field = get_model_field(self.model, path)
+        return WherePath(lookup, field=field, many=schema['many'])
+
+    def get_where_reference(self, path):
+        """Get a single-valued model field path as an F expression"""
+        reference = self.get_where_path(path)
+        if reference.many:
+            raise Untranslatable(f'Invalid source field "{path}", not a value')
+        return F(reference.lookup)
+
+
+def translate_source(source, model):
+    """Translate a computed source into a database expression
+
+    Returns:
+        expression, or None if the source can only be evaluated in Python
+    """
+    try:
+        return SourceTranslator(model).translate(source)
+    except Untranslatable:
+        return None
@@ -67,7 +67,7 @@ def get_link(T):
             return get_link(items) if items else None
         if base_type == 'object':
             additional = get_type_property(T, 'additionalProperties')
-            return get_link(additionalProperties) if isinstance(additional, dict) else None
+            return get_link(additional) if isinstance(additional, dict) else None
         return None
 
     for check in get_split_types(T):
@@ -80,6 +80,33 @@ def get_link(T):
     return None
 
 
+def get_links(T):
+    """Get every resource T links to, e.g. ["posts", "comments"]
+
+    Polymorphic links list several targets:
+    {"type": "array", "items": {"anyOf": ["@posts", "@comments"]}}
+    """
+    base_type = get_type_name(T)
+    if base_type:
+        if base_type.startswith('@'):
+            return [base_type[1:]]
+        if base_type == 'array':
+            items = get_type_property(T, 'items')
+            return get_links(items) if items else []
+        if base_type == 'object':
+            additional = get_type_property(T, 'additionalProperties')
+            return get_links(additional) if isinstance(additional, dict) else []
+        return []
+
+    links = []
+    for check in get_split_types(T):
+        for item in check or []:
+            for link in get_links(item):
+                if link not in links:
+                    links.append(link)
+    return links
+
+
 def is_list(T):
     """Return true if T is a list type or optional list type"""
     base_type = get_type_name(T)
@@ -94,63 +121,6 @@ def is_list(T):
                 if is_list(item):
                     return True
 
-def validate_object(type, value, throw=False):
-    if not isinstance(value, dict) and throw:
-        if throw:
-            raise TypeValidationError(f'expecting object but got: {value}')
-        return False
-    return True
-
-
-def validate_array(type, value, throw=False):
-    if not isinstance(value, list) and throw:
-        if throw:
-            raise TypeValidationError(f'expecting array but got: {value}')
-        return False
-    return True
-
-
-def validate_link(type, value, throw=False):
-    if not isinstance(value, (object, int, float, str)):
-        if throw:
-            raise TypeValidationError(f'expecting link but got: {value}')
-        return False
-    return validate_multi(type, value, throw=throw)
-
-
-def validate_boolean(type, value, throw=False):
-    if not isinstance(value, bool) or (
-        isinstance(value, str) and value.lower() not in {'true', 'false'}
-    ):
-        if throw:
-            raise TypeValidationError(f'expecting boolean but got: {value}')
-        return False
-    return validate_multi(type, value, throw=throw)
-
-
-def validate_null(type, value, throw=False):
-    if not isinstance(value, bool):
-        if throw:
-            raise TypeValidationError(f'expecting boolean but got: {value}')
-        return False
-    return validate_multi(type, value, throw=throw)
-
-def validate_number(type, value, throw=True):
-    if not isinstance(value, (int, float, Decimal)):
-        # TODO: what about strings with numeric value?
-        if throw:
-            raise TypeValidationError(f'expecting string but got: {value}')
-        return False
-    return validate_multi(type, value, throw=throw)
-
-
-def validate_string(type, value, throw=True):
-    if not isinstance(value, str):
-        if throw:
-            raise TypeValidationError(f'expecting string but got: {value}')
-        return False
-    return validate_multi(type, value, throw=throw)
-
 
 def get_type_property(type, key):
     return type.get(key) if isinstance(type, dict) else None
@@ -167,37 +137,6 @@ def one(iterable):
     return one
 
 
-def validate_multi(type, value, throw=True):
-    any_of = get_type_property(type, 'anyOf')
-    all_of = get_type_property(type, 'allOf')
-    one_of = get_type_property(type, 'oneOf')
-    not_ = get_type_property(type, 'not')
-    types = get_type_names(type)
-
-
-    if types and not any([validate(t, value, throw=False) for t in types]):
-        if throw:
-            raise TypeValidationError(f'types({types}) not satisfied by: {value}')
-        return False
-    if any_of and not any([validate(t, value, throw=False) for t in any_of]):
-        if throw:
-            raise TypeValidationError(f'anyOf({any_of}) not satisfied by: {value}')
-        return False
-    if all_of and not all([validate(t, value, throw=False) for t in all_of]):
-        if throw:
-            raise TypeValidationError(f'allOf({any_of}) not satisfied by: {value}')
-        return False
-    if one_of and not one([validate(t, value, throw=False) for t in one_of]):
-        if throw:
-            raise TypeValidationError(f'oneOf({any_of}) not satisfied by: {value}')
-        return False
-    if not_ and validate(not_, value, throw=False):
-        if throw:
-            raise TypeValidationError(f'not({not_}) was satisfied by: {value}')
-        return False
-    return True
-
-
 def get_type_name(type):
     if isinstance(type, str):
         return type
@@ -214,27 +153,145 @@ def get_type_names(type):
     return None
 
 
-def validate(type, value, throw=True):
+# checks for base types: type name -> (check, expected name)
+BASE_CHECKS = {
+    'array': (lambda value: isinstance(value, list), 'array'),
+    'object': (lambda value: isinstance(value, dict), 'object'),
+    'string': (lambda value: isinstance(value, str), 'string'),
+    'null': (lambda value: value is None, 'null'),
+    # TODO: what about strings with numeric value?
+    'number': (lambda value: isinstance(value, (int, float, Decimal)), 'number'),
+    'boolean': (lambda value: isinstance(value, bool), 'boolean'),
+}
+# base types whose composite keywords (anyOf, oneOf...) are not checked
+CONTAINER_TYPES = {'array', 'object'}
+
+
+def accept(value, throw=True):
+    return True
+
+
+def compile_multi(type):
+    """Compile the composite keywords of a type (anyOf, allOf, oneOf, not)
+
+    Returns:
+        list of (test, message) pairs
+    """
+    tests = []
+    types = get_type_names(type)
+    if types:
+        validators = [compile_type(t) for t in types]
+        tests.append((
+            lambda value: any(v(value, throw=False) for v in validators),
+            f'types({types}) not satisfied by: '
+        ))
+    any_of = get_type_property(type, 'anyOf')
+    if any_of:
+        any_validators = [compile_type(t) for t in any_of]
+        tests.append((
+            lambda value: any(v(value, throw=False) for v in any_validators),
+            f'anyOf({any_of}) not satisfied by: '
+        ))
+    all_of = get_type_property(type, 'allOf')
+    if all_of:
+        all_validators = [compile_type(t) for t in all_of]
+        tests.append((
+            lambda value: all(v(value, throw=False) for v in all_validators),
+            f'allOf({all_of}) not satisfied by: '
+        ))
+    one_of = get_type_property(type, 'oneOf')
+    if one_of:
+        one_validators = [compile_type(t) for t in one_of]
+        tests.append((
+            lambda value: one(v(value, throw=False) for v in one_validators),
+            f'oneOf({one_of}) not satisfied by: '
+        ))
+    not_ = get_type_property(type, 'not')
+    if not_:
+        not_validator = compile_type(not_)
+        tests.append((
+            lambda value: not not_validator(value, throw=False),
+            f'not({not_}) was satisfied by: '
+        ))
+    return tests
+
+
+def compile_type(type):
+    """Compile a type into a validator, interpreting the type only once
+
+    Returns:
+        validator(value, throw=True) -> bool
+        raises TypeValidationError on failure if throw is set
+    """
     base_type = get_type_name(type)
+    check = expected = None
+    if base_type in BASE_CHECKS:
+        check, expected = BASE_CHECKS[base_type]
+    elif not (
+        base_type is None or base_type == 'any' or base_type.startswith('@')
+    ):
+        # unsupported named type (e.g. "type"), not validated
+        return accept
+
+    tests = [] if base_type in CONTAINER_TYPES else compile_multi(type)
+    if check is None and not tests:
+        return accept
+
+    def validator(value, throw=True):
+        if check is not None and not check(value):
+            if throw:
+                raise TypeValidationError(
+                    f'expecting {expected} but got: {value}'
+                )
+            return False
+        for test, message in tests:
+            if not test(value):
+                if throw:
+                    raise TypeValidationError(f'{message}{value}')
+                return False
+        return True
 
-    if base_type == 'array':
-        # array
-        return validate_array(type, value, throw=throw)
-    elif base_type == 'object':
-        # object
-        return validate_object(type, value, throw=throw)
-    elif base_type == 'string':
-        # string
-        return validate_string(type, value, throw=throw)
-    elif base_type == 'null':
-        return validate_null(type, value, throw=throw)
-    elif base_type == 'number':
-        return validate_number(type, value, throw=throw)
-    elif base_type == 'boolean':
-        return validate_boolean(type, value, throw=throw)
-    elif base_type and base_type.startswith('@'):
-        # link type
-        return validate_link(type, value, throw=throw)
-    elif base_type is None or base_type == 'any':
-        # any or unspecified type
-        return validate_multi(type, value, throw=throw)
+    return validator
+
+
+def validate(type, value, throw=True):
+    """Validate a value against a type
+
+    To validate many values against the same type,
+    use the validator returned by compile_type instead.
+    """
+    return compile_type(type)(value, throw=throw)
+
+
+def validate_records(types, records):
+    """Validate a batch of records, column by column
+
+    Each type is compiled once and checked against its whole column,
+    collecting every failure rather than raising on the first one.
+    Fields missing from a record are not checked.
+
+    Arguments:
+        types: dict of field name -> type
+        records: list of dicts of field name -> value
+    Returns:
+        dict of row index -> {field name: error message},
+        empty if all records are valid
+    """
+    errors = {}
+    for name, type in types.items():
+        validator = compile_type(type)
+        for i, record in enumerate(records):
+            if name not in record:
+                continue
+            value = record[name]
+            if not validator(value, throw=False):
+                try:
+                    validator(value)
+                except TypeValidationError as e:
+                    errors.setdefault(i, {})[name] = str(e)
+
+    for i, record in enumerate(records):
+        for name in record:
+            if name not in types:
+                errors.setdefault(i, {})[name] = f'{name} is not a valid field'
+    return errors
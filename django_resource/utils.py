@@ -1,11 +1,22 @@
+from functools import lru_cache
 from django.template import Template, Context
 from django.utils.functional import cached_property  # noqa
 
+# number of distinct template sources kept compiled
+TEMPLATE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def get_template(source):
+    """Compile a template once per source"""
+    return Template(source)
+
 
 def resolve(template, context):
-    template = Template(template)
-    context = Context(context)
-    return template.render(context)
+    if '{' not in template:
+        # no tags or variables, renders as itself
+        return template
+    return get_template(template).render(Context(context))
 
 
 def get(template, context):
@@ -40,3 +51,23 @@ def merge(source, dest):
             # else: merge a boolean and dict together as the dict
 
     return dest
+
+
+def merged(source, dest):
+    """Like merge, but return a new dict instead of changing dest
+
+    Only the dicts along merged paths are copied; every other subtree
+    is shared with source and dest, which are never changed.
+    """
+    result = dict(dest)
+    for key, value in source.items():
+        if isinstance(value, dict):
+            node = result.get(key)
+            result[key] = merged(value, node if isinstance(node, dict) else {})
+        else:
+            curr = result.get(key)
+            if not isinstance(curr, dict) or not isinstance(value, bool):
+                result[key] = value
+            # else: merge a boolean and dict together as the dict
+
+    return result
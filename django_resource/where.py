@@ -0,0 +1,229 @@
+from django.db.models import Q
+
+from .boolean import AND, OR, NOT
+from .exceptions import QueryValidationError
+
+QUOTES = {'"', "'"}
+# operator -> (lookup, negated)
+OPERATORS = {
+    '=': ('exact', False),
+    '!=': ('exact', True),
+    '<': ('lt', False),
+    '<=': ('lte', False),
+    '>': ('gt', False),
+    '>=': ('gte', False),
+    'in': ('in', False),
+    'not.in': ('in', True),
+    'range': ('range', False),
+    'null': ('isnull', False),
+    'not.null': ('isnull', True),
+    'contains': ('contains', False),
+    'matches': ('regex', False),
+}
+NULL_OPERATORS = {'null', 'not.null'}
+ALIASES = {
+    'equals': '=',
+    'not.equals': '!=',
+}
+# suffix of querystring operators that compare against another field
+REFERENCE_SUFFIX = '$'
+# first part of references to the parent level's record, e.g. "parent.tag"
+PARENT_REFERENCE = 'parent'
+# Django internal types of array-valued columns
+ARRAY_TYPES = {'ArrayField'}
+JSON_TYPES = {'JSONField'}
+
+
+def quote(value):
+    """Mark a querystring value as a literal"""
+    if isinstance(value, str):
+        return f'"{value}"'
+    if isinstance(value, list):
+        return [quote(v) for v in value]
+    return value
+
+
+def is_quoted(value):
+    return (
+        isinstance(value, str)
+        and len(value) >= 2
+        and value[0] in QUOTES
+        and value[-1] == value[0]
+    )
+
+
+class WherePath(object):
+    """A where key resolved against a level's fields
+
+    Arguments:
+        lookup: Django lookup, e.g. "groups__name"
+        field: model field at the end of the path, None for links
+        link: whether the path ends in a link (compared by ID)
+        many: whether the path crosses a to-many relation
+    """
+
+    def __init__(self, lookup, field=None, link=False, many=False):
+        self.lookup = lookup
+        self.field = field
+        self.link = link
+        self.many = many
+
+    @property
+    def internal_type(self):
+        get_type = getattr(self.field, 'get_internal_type', None)
+        return get_type() if get_type else None
+
+
+class WhereCompiler(object):
+    """Compiles where trees into Django Q objects
+
+    Where trees nest boolean operators around conditions:
+
+        {"or": [
+            {"contains": ["users.location.name", '"New York"']},
+            {"not": {"in": ["users", [1, 2]]}},
+            {"=": ["tag", "parent.tag"]}
+        ]}
+
+    The first operand of a condition is a dotted path of field names,
+    followed across links. Other operands are literals if quoted or if
+    not strings, and paths to other fields otherwise.
+
+    Conditions on paths that cross to-many links are compiled into
+    pk IN (subquery) so that they never duplicate rows.
+
+    Arguments:
+        level: executor level, resolves paths with get_where_path
+            and field references with get_where_reference
+        operators: operators allowed by the where feature, or None for all
+    """
+
+    def __init__(self, level, operators=None):
+        self.level = level
+        self.operators = set(operators) if operators else None
+
+    def compile(self, where):
+        if isinstance(where, list):
+            # implicit and
+            return self.combine(AND, where)
+        if not isinstance(where, dict) or len(where) != 1:
+            raise QueryValidationError(f'Invalid where "{where}"')
+
+        operator, operands = next(iter(where.items()))
+        if operator in (AND, OR):
+            if not isinstance(operands, list):
+                raise QueryValidationError(
+                    f'Invalid where, "{operator}" expects a list'
+                )
+            return self.combine(operator, operands)
+        if operator == NOT:
+            return ~self.compile(operands)
+        return self.compile_condition(operator, operands)
+
+    def combine(self, operator, operands):
+        result = Q()
+        for operand in operands:
+            q = self.compile(operand)
+            result = result & q if operator == AND else result | q
+        return result
+
+    def compile_condition(self, operator, operands):
+        operator = ALIASES.get(operator, operator)
+        if operator not in OPERATORS or (
+            self.operators is not None and operator not in self.operators
+        ):
+            raise QueryValidationError(f'Invalid where operator "{operator}"')
+
+        if isinstance(operands, dict):
+            # {"in": {"name": ["'a'", "'b'"]}}
+            return self.combine(
+                AND, [{operator: [key, value]} for key, value in operands.items()]
+            )
+        if isinstance(operands, str):
+            # {"null": "name"}
+            operands = [operands]
+        if not isinstance(operands, list) or not 1 <= len(operands) <= 2:
+            raise QueryValidationError(
+                f'Invalid operands for where operator "{operator}"'
+            )
+        key = operands[0]
+        if not isinstance(key, str):
+            raise QueryValidationError(f'Invalid where key "{key}"')
+
+        path = self.level.get_where_path(key)
+        lookup, negated = OPERATORS[operator]
+        if lookup == 'isnull':
+            value = self.get_value(operands[1]) if len(operands) > 1 else True
+            if value is False:
+                negated = not negated
+            value = True
+        elif len(operands) != 2:
+            raise QueryValidationError(
+                f'Missing value for where operator "{operator}"'
+            )
+        else:
+            if path.many and self.has_parent_reference(operands[1]):
+                raise QueryValidationError(
+                    f'Invalid where key "{key}", cannot compare a to-many '
+                    f'field with the parent record'
+                )
+            value = self.get_value(operands[1])
+            lookup, value = self.get_lookup(path, lookup, value, operator)
+
+        if lookup == 'exact' and value is None:
+            lookup, value = 'isnull', True
+
+        q = Q(**{f'{path.lookup}__{lookup}': value})
+        if path.many:
+            # semi-join: pk IN (SELECT pk ... WHERE condition)
+            q = Q(pk__in=self.level.model._default_manager.filter(q).values('pk'))
+        return ~q if negated else q
+
+    def get_lookup(self, path, lookup, value, operator):
+        """Adjust a lookup to the type of the field it applies to"""
+        if lookup in ('in', 'range'):
+            if not isinstance(value, list):
+                value = [value]
+            if lookup == 'range' and len(value) != 2:
+                raise QueryValidationError(
+                    f'Where operator "{operator}" expects two values'
+                )
+        elif lookup == 'contains':
+            internal_type = path.internal_type
+            if path.link:
+                # linked IDs: a join on the relation's indexed column
+                lookup = 'exact'
+            elif internal_type in ARRAY_TYPES:
+                # array containment, can use a GIN index
+                value = value if isinstance(value, list) else [value]
+            elif internal_type not in JSON_TYPES and not (
+                isinstance(value, str) or hasattr(value, 'resolve_expression')
+            ):
+                raise QueryValidationError(
+                    f'Where operator "{operator}" expects a string'
+                )
+        return lookup, value
+
+    def has_parent_reference(self, value):
+        if isinstance(value, list):
+            return any(self.has_parent_reference(v) for v in value)
+        return (
+            isinstance(value, str)
+            and not is_quoted(value)
+            and value.split('.')[0] == PARENT_REFERENCE
+        )
+
+    def get_value(self, value):
+        """Get a literal value or a reference to another field"""
+        if isinstance(value, list):
+            return [self.get_value(v) for v in value]
+        if is_quoted(value):
+            return value[1:-1]
+        if isinstance(value, str):
+            return self.level.get_where_reference(value)
+        return value
+
+
+def compile_where(where, level, operators=None):
+    """Compile a where tree into a Q for the given executor level"""
+    return WhereCompiler(level, operators=operators).compile(where)
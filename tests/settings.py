@@ -12,3 +12,7 @@ DATABASES["default"] = {
     "NAME": "resource_dev",
     "TEST": {"NAME": "resource_test"},
 }
+INSTALLED_APPS = [
+    "django.contrib.contenttypes",
+    "django.contrib.auth",
+]
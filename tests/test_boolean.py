@@ -0,0 +1,49 @@
+from django.test import SimpleTestCase
+from django_resource.boolean import build_expression
+from django_resource.exceptions import ExpressionValidationError
+
+
+class BuildExpressionTestCase(SimpleTestCase):
+    mapping = {key: key.upper() for key in 'abcdef'}
+
+    def test_precedence(self):
+        self.assertEqual(
+            build_expression('a and not b or c', self.mapping),
+            {'or': [{'and': ['A', {'not': 'B'}]}, 'C']}
+        )
+        self.assertEqual(
+            build_expression('a, ~(b & c)', self.mapping),
+            {'or': ['A', {'not': {'and': ['B', 'C']}}]}
+        )
+
+    def test_no_cnf_expansion(self):
+        # would expand to 2^3 clauses in conjunctive normal form
+        self.assertEqual(
+            build_expression('(a and b) or (c and d) or (e and f)', self.mapping),
+            {'or': [
+                {'and': ['A', 'B']},
+                {'and': ['C', 'D']},
+                {'and': ['E', 'F']}
+            ]}
+        )
+
+    def test_max_depth(self):
+        expression = 'a and (b or (c and not d))'
+        self.assertEqual(
+            build_expression(expression, self.mapping, max_depth=4),
+            {'and': ['A', {'or': ['B', {'and': ['C', {'not': 'D'}]}]}]}
+        )
+        with self.assertRaises(ExpressionValidationError):
+            build_expression(expression, self.mapping, max_depth=3)
+
+    def test_invalid(self):
+        for expression in ('a and', '(a or b', 'a b', 'a or x'):
+            with self.assertRaises(ExpressionValidationError):
+                build_expression(expression, self.mapping)
+
+    def test_long_chain(self):
+        mapping = {f's{i}': i for i in range(5000)}
+        expression = ' and '.join(mapping.keys())
+        self.assertEqual(
+            build_expression(expression, mapping), {'and': list(range(5000))}
+        )
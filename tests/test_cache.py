@@ -0,0 +1,106 @@
+import pickle
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from django_resource.cache import DjangoRecordCache, LocalRecordCache, LRUCache
+from django_resource.record import get_record_type
+
+from .test_executor import make_space
+
+LOCMEM = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django_resource.tests',
+    }
+}
+
+
+class LRUCacheTestCase(SimpleTestCase):
+    def test_ttl(self):
+        cache = LRUCache(10, ttl=5)
+        with mock.patch('time.monotonic', return_value=100):
+            cache.set('a', 1)
+        with mock.patch('time.monotonic', return_value=104):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('time.monotonic', return_value=105):
+            self.assertEqual(cache.get('a'), None)
+        self.assertEqual(len(cache), 0)
+
+    def test_unbounded(self):
+        cache = LRUCache(None)
+        for i in range(100):
+            cache.set(i, i)
+        self.assertEqual(len(cache), 100)
+
+
+class LocalRecordCacheTestCase(SimpleTestCase):
+    def test_eviction(self):
+        cache = LocalRecordCache(size=2)
+        cache.set('users', 1, {'id': 1})
+        cache.set('users', 2, {'id': 2})
+        cache.get('users', 1)
+        cache.set('groups', 1, {'id': 1})
+        # least recently used is evicted
+        self.assertEqual(
+            cache.get_many('users', [1, 2]), {1: {'id': 1}}
+        )
+
+    def test_invalidate(self):
+        cache = LocalRecordCache()
+        cache.set_many('users', {1: {'id': 1}, 2: {'id': 2}})
+        cache.set('groups', 1, {'id': 1})
+
+        cache.invalidate('users', 1)
+        self.assertEqual(cache.get_many('users', [1, 2]), {2: {'id': 2}})
+        cache.invalidate('users')
+        self.assertEqual(cache.get_many('users', [1, 2]), {})
+        self.assertEqual(cache.get('groups', 1), {'id': 1})
+        cache.invalidate()
+        self.assertEqual(cache.get('groups', 1), None)
+
+
+@override_settings(CACHES=LOCMEM)
+class DjangoRecordCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache = DjangoRecordCache(namespace='test')
+        self.cache.cache.clear()
+
+    def test_get_set(self):
+        User = get_record_type('users', ('id', 'name'))
+        self.cache.set_many('users', {1: User((1, 'Joe')), 2: {'id': 2}})
+        records = self.cache.get_many('users', [1, 2, 3])
+        self.assertEqual(records, {1: {'id': 1, 'name': 'Joe'}, 2: {'id': 2}})
+        self.assertEqual(records[1].name, 'Joe')
+        # namespaces do not share records
+        other = DjangoRecordCache(namespace='other')
+        self.assertEqual(other.get_many('users', [1, 2]), {})
+
+    def test_invalidate(self):
+        self.cache.set_many('users', {1: {'id': 1}, 2: {'id': 2}})
+        self.cache.set('groups', 1, {'id': 1})
+
+        self.cache.invalidate('users', 1)
+        self.assertEqual(self.cache.get_many('users', [1, 2]), {2: {'id': 2}})
+        self.cache.invalidate('users')
+        self.assertEqual(self.cache.get_many('users', [1, 2]), {})
+        self.assertEqual(self.cache.get('groups', 1), {'id': 1})
+        self.cache.set('users', 1, {'id': 1})
+        self.cache.invalidate()
+        self.assertEqual(self.cache.get('groups', 1), None)
+        self.assertEqual(self.cache.get('users', 1), None)
+
+    def test_invalidate_space(self):
+        with override_settings(DJANGO_RESOURCE={'RECORD_CACHE': {
+            'BACKEND': 'django_resource.cache.DjangoRecordCache',
+        }}):
+            space = make_space()
+        self.assertIsInstance(space._records, DjangoRecordCache)
+        space._records.set('users', 1, {'id': 1})
+        space.invalidate()
+        self.assertEqual(space._records.get('users', 1), None)
+
+    def test_pickle_record(self):
+        User = get_record_type('users', ('id', 'name'))
+        user = pickle.loads(pickle.dumps(User((1, 'Joe'))))
+        self.assertIs(type(user), User)
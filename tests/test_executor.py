@@ -0,0 +1,255 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import Group, Permission, User
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_resource.exceptions import QueryValidationError
+from django_resource.executor import DjangoExecutor
+from django_resource.record import Record
+from django_resource.space import Space
+from django_resource.resource import Resource
+from django_resource.server import Server
+
+
+def make_space():
+    server = Server(url='http://localhost/api')
+    space = Space(name='test', server=server)
+    users = Resource(
+        id='test.users',
+        name='users',
+        source='auth.user',
+        fields={
+            'id': 'id',
+            'username': 'username',
+            'groups': {
+                'type': {'type': 'array', 'items': '@groups'},
+                'source': 'groups',
+            },
+        }
+    )
+    groups = Resource(
+        id='test.groups',
+        name='groups',
+        source='auth.group',
+        fields={
+            'id': 'id',
+            'name': 'name',
+            'users': {
+                'type': {'type': 'array', 'items': '@users'},
+                'source': 'user',
+            },
+        }
+    )
+    space.add('resources', [users, groups])
+    return space
+
+
+class ExecutorTestCase(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f'group{i}') for i in range(3)]
+        self.users = []
+        for i in range(10):
+            user = User.objects.create(username=f'user{i}')
+            user.groups.set(self.groups[: i % 3 + 1])
+            self.users.append(user)
+        self.space = make_space()
+
+    def test_one_query_per_level(self):
+        query = (
+            self.space.data.query
+            .take.users('id', 'username', 'groups')
+            .take.users.groups('id', 'name')
+            .take.users.groups.users('id')
+        )
+        with self.assertNumQueries(3):
+            result = query.get()
+
+        key = result['key']['users']
+        data = result['data']
+        self.assertEqual(key, [user.pk for user in self.users])
+        self.assertEqual(
+            data['users'][self.users[0].pk],
+            {'id': self.users[0].pk, 'username': 'user0'}
+        )
+        self.assertEqual(
+            sorted(data['users.groups'][self.users[2].pk]),
+            [group.pk for group in self.groups]
+        )
+        self.assertEqual(
+            data['groups'][self.groups[0].pk]['name'], 'group0'
+        )
+        self.assertEqual(
+            len(data['groups.users'][self.groups[0].pk]), 10
+        )
+
+    def test_record(self):
+        user = self.users[1]
+        users = self.space.data.executor.get_resource('users')
+        query = users.data.query.record(user.pk).take('username')
+        with self.assertNumQueries(1):
+            result = query.get()
+
+        self.assertEqual(result['key'], {'users': user.pk})
+        self.assertEqual(
+            result['data']['users'], {user.pk: {'username': 'user1'}}
+        )
+
+    def test_keyset_pagination(self):
+        users = self.space.data.executor.get_resource('users')
+        query = users.data.query.take('username').sort('-username')
+        expected = sorted(
+            [user.pk for user in self.users],
+            key=lambda pk: User.objects.get(pk=pk).username,
+            reverse=True
+        )
+
+        seen = []
+        key = None
+        while True:
+            page = {'size': 4, 'key': key} if key else {'size': 4}
+            with self.assertNumQueries(1):
+                result = query.page(page).get()
+            seen.extend(result['key']['users'])
+            key = result.get('meta', {}).get('page', {}).get('users', {}).get('next')
+            if not key:
+                break
+
+        self.assertEqual(seen, expected)
+
+    def test_keyset_pagination_nulls(self):
+        now = timezone.now()
+        for i, user in enumerate(self.users):
+            if i % 2:
+                user.last_login = now - timedelta(days=i % 3)
+                user.save()
+        ordered = {
+            direction: [
+                user.pk for user in User.objects.order_by(
+                    F('last_login').asc(nulls_last=True) if direction == 'lastLogin'
+                    else F('last_login').desc(nulls_first=True),
+                    'pk'
+                )
+            ] for direction in ('lastLogin', '-lastLogin')
+        }
+
+        accounts = Resource(
+            id='test.accounts',
+            name='accounts',
+            source='auth.user',
+            fields={'id': 'id', 'lastLogin': 'last_login'}
+        )
+        self.space.add('resources', [accounts])
+        for direction, expected in ordered.items():
+            query = accounts.data.query.take('id').sort(direction)
+            seen = []
+            key = None
+            while True:
+                page = {'size': 3, 'key': key} if key else {'size': 3}
+                result = query.page(page).get()
+                seen.extend(result['key']['accounts'])
+                meta = result.get('meta', {}).get('page', {})
+                key = meta.get('accounts', {}).get('next')
+                if not key:
+                    break
+            self.assertEqual(seen, expected, direction)
+
+    def test_projection(self):
+        users = self.space.data.executor.get_resource('users')
+        query = users.data.query.take('username').sort('-username')
+        with CaptureQueriesContext(connection) as context:
+            result = query.page(size=2).get()
+        sql = context.captured_queries[0]['sql']
+        self.assertIn('"username"', sql)
+        self.assertNotIn('"password"', sql)
+        self.assertEqual(
+            list(result['data']['users'].values()),
+            [{'username': 'user9'}, {'username': 'user8'}]
+        )
+
+        # model attributes are read from instances
+        accounts = Resource(
+            id='test.accounts',
+            name='accounts',
+            source='auth.user',
+            fields={
+                'id': 'id',
+                'active': {'source': 'is_authenticated', 'type': 'boolean'},
+            }
+        )
+        self.space.add('resources', [accounts])
+        result = accounts.data.query.record(self.users[0].pk).get()
+        self.assertEqual(
+            result['data']['accounts'][self.users[0].pk],
+            {'id': self.users[0].pk, 'active': True}
+        )
+
+    def test_dotted_sources(self):
+        members = Resource(
+            id='test.members',
+            name='members',
+            source='auth.user',
+            fields={'id': 'id', 'groupNames': {'source': 'groups.name'}}
+        )
+        self.space.add('resources', [members])
+        user = self.users[1]
+        # the level's rows, then the prefetched groups
+        with self.assertNumQueries(2):
+            result = members.data.query.take('id', 'groupNames').get()
+        self.assertEqual(
+            sorted(result['data']['members'][user.pk]['groupNames']),
+            ['group0', 'group1']
+        )
+
+    def test_sort_keys(self):
+        users = self.space.data.executor.get_resource('users')
+        with self.assertRaises(QueryValidationError):
+            users.data.query.take('id').sort('groups').get()
+
+        # to-one links sort by ID
+        permissions = Resource(
+            id='test.permissions',
+            name='permissions',
+            source='auth.permission',
+            fields={'id': 'id', 'contentType': 'content_type'}
+        )
+        self.space.add('resources', [permissions])
+        query = permissions.data.query.take('id').sort('-contentType')
+        seen = []
+        key = None
+        while True:
+            page = {'size': 5, 'key': key} if key else {'size': 5}
+            result = query.page(page).get()
+            seen.extend(result['key']['permissions'])
+            meta = result.get('meta', {}).get('page', {})
+            key = meta.get('permissions', {}).get('next')
+            if not key:
+                break
+        self.assertEqual(
+            seen,
+            list(
+                Permission.objects.order_by('-content_type_id', 'pk')
+                .values_list('pk', flat=True)
+            )
+        )
+
+    def test_invalid_page_key(self):
+        users = self.space.data.executor.get_resource('users')
+        query = users.data.query.take('username').page(key='invalid')
+        with self.assertRaises(QueryValidationError):
+            query.get()
+
+    def test_compact_records(self):
+        users = self.space.data.executor.get_resource('users')
+        executor = DjangoExecutor(self.space, compact=True)
+        query = users.data.query.take('id', 'username', 'groups')
+        result = executor.get(query)
+
+        user = self.users[0]
+        record = result['data']['users'][user.pk]
+        self.assertIsInstance(record, Record)
+        self.assertEqual(record.username, 'user0')
+        self.assertEqual(record, {'id': user.pk, 'username': 'user0'})
+        self.assertFalse(hasattr(record, '__dict__'))
@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase
+from django_resource.expression import format_expression
+from django_resource.utils import get_template, resolve
+
+
+class TemplateCacheTestCase(SimpleTestCase):
+    def test_compiled_once(self):
+        get_template.cache_clear()
+        for i in range(100):
+            self.assertEqual(
+                format_expression('{{ .name }}/{{ .id }}', {'name': 'a', 'id': i}),
+                f'a/{i}'
+            )
+        info = get_template.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 99))
+
+    def test_plain_text(self):
+        get_template.cache_clear()
+        self.assertEqual(resolve('first_name', {}), 'first_name')
+        self.assertEqual(get_template.cache_info().currsize, 0)
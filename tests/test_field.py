@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from django_resource.field import Field, defer_inverses
+from django_resource.resource import Resource
+
+from .test_executor import make_space
+
+
+class ListFieldTestCase(SimpleTestCase):
+    def test_add_remove(self):
+        space = make_space()
+        users = space.resources[0]
+        field = space.get_field('resources')
+        self.assertEqual(field.get_ids(), {'test.users', 'test.groups'})
+
+        # duplicates are skipped
+        space.add('resources', [users])
+        self.assertEqual(
+            space.get_property('resources'), ['test.users', 'test.groups']
+        )
+
+        tags = Resource(id='test.tags', name='tags', fields={'id': 'id'})
+        space.add('resources', [tags])
+        self.assertEqual(
+            space.get_property('resources'),
+            ['test.users', 'test.groups', 'test.tags']
+        )
+        self.assertIs(tags.space, space)
+
+        space.remove('resources', [users, tags])
+        self.assertEqual(space.get_property('resources'), ['test.groups'])
+        self.assertEqual([r.name for r in space.resources], ['groups'])
+        self.assertEqual(field.get_ids(), {'test.groups'})
+        # single inverses are cleared
+        self.assertIsNone(tags.space)
+        self.assertIsNone(users.space)
+
+    def test_remove_single(self):
+        space = make_space()
+        tags = Resource(id='test.tags', name='tags', fields={'id': 'id'})
+        space.add('resources', [tags])
+
+        tags.remove('space', space)
+        self.assertIsNone(tags.space)
+        self.assertEqual(
+            space.get_property('resources'), ['test.users', 'test.groups']
+        )
+
+        tags.description = 'Tags'
+        tags.remove('description', 'other')
+        self.assertEqual(tags.description, 'Tags')
+        tags.remove('description', 'Tags')
+        self.assertIsNone(tags.description)
+
+    def test_polymorphic_links(self):
+        class Target(Resource):
+            class Schema:
+                id = 'targets'
+                name = 'targets'
+                space = '.'
+                fields = {
+                    'id': {'type': 'string', 'primary': True},
+                    'links': {
+                        'type': {
+                            'type': 'array',
+                            'items': {'anyOf': ['@spaces', '@types']}
+                        }
+                    },
+                }
+
+        root = make_space().server.root
+        # each key is resolved against the first target it matches
+        with mock.patch.object(Field, 'get_space', return_value=root):
+            target = Target(id='a', links=['.', 'string'])
+            spaces, types = target.links
+        self.assertIs(spaces, root)
+        self.assertEqual(types.get_meta('name'), 'types')
+        self.assertEqual(types.get_id(), 'string')
+
+    def test_defer_inverses(self):
+        space = make_space()
+        tags = [
+            Resource(id=f'test.tag{i}', name=f'tag{i}', fields={'id': 'id'})
+            for i in range(3)
+        ]
+        with defer_inverses():
+            space.add('resources', tags)
+            # not applied yet
+            self.assertEqual(tags[0].get_field('space')._value, None)
+            space.remove('resources', tags[2])
+
+        self.assertEqual([tag.space for tag in tags[:2]], [space, space])
+        self.assertIsNone(tags[2].space)
+        self.assertEqual(len(space.resources), 4)
+
+    def test_defer_inverses_error(self):
+        space = make_space()
+        tag = Resource(id='test.tag', name='tag', fields={'id': 'id'})
+        with self.assertRaises(ValueError):
+            with defer_inverses():
+                space.add('resources', [tag])
+                raise ValueError()
+        # queued inverses are dropped
+        self.assertIsNone(tag.get_field('space')._value)
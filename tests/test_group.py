@@ -0,0 +1,90 @@
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+
+from django_resource.exceptions import QueryValidationError
+from django_resource.query import Query
+
+from .test_executor import make_space
+
+
+class GroupTestCase(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f'group{i}') for i in range(3)]
+        self.users = []
+        for i in range(6):
+            user = User.objects.create(username=f'user{i}')
+            user.groups.set(self.groups[: i % 3 + 1])
+            self.users.append(user)
+        self.space = make_space()
+        self.executor = self.space.data.executor
+        self.query = self.executor.get_resource('users').data.query
+
+    def test_per_record(self):
+        query = self.query.take('id').group({
+            'group_count': {'count': 'groups.id'},
+            'last_group': {'max': 'groups.name'},
+        })
+        with self.assertNumQueries(1):
+            result = query.get()
+        users = result['data']['users']
+        for i, user in enumerate(self.users):
+            self.assertEqual(users[user.pk]['group_count'], i % 3 + 1)
+            self.assertEqual(users[user.pk]['last_group'], f'group{i % 3}')
+        self.assertNotIn('meta', result)
+
+    def test_level(self):
+        query = self.query.take('id').page(size=2).group({
+            'total': {'count': 'id'},
+            'first': {'min': 'username'},
+        })
+        with self.assertNumQueries(1):
+            result = query.get()
+        self.assertEqual(len(result['key']['users']), 2)
+        self.assertEqual(
+            result['meta']['group'], {'users': {'total': 6, 'first': 'user0'}}
+        )
+
+        # later pages aggregate over the whole level, not the remaining rows
+        cursor = result['meta']['page']['users']['next']
+        result = query.page(key=cursor).get()
+        self.assertEqual(
+            result['meta']['group'], {'users': {'total': 6, 'first': 'user0'}}
+        )
+
+        query = self.query.take('id').where({'=': ['username', '"none"']})
+        result = query.group({
+            'total': {'count': 'id'}, 'first': {'min': 'username'}
+        }).get()
+        self.assertEqual(
+            result['meta']['group'], {'users': {'total': 0, 'first': None}}
+        )
+
+    def test_distinct(self):
+        query = self.executor.get_resource('groups').data.query.take('id')
+        result = query.group({
+            'users': {'count': 'users.id'},
+            'names': {'distinct': 'name'},
+        }).page(size=1).get()
+        groups = result['data']['groups']
+        self.assertEqual(groups[self.groups[0].pk]['users'], 6)
+        self.assertEqual(result['meta']['group'], {'groups': {'names': 3}})
+
+    def test_querystring(self):
+        query = Query.from_querystring(
+            'take=id&group:group_count:count=groups.id',
+            executor=self.executor,
+            state={'.resource': 'users'}
+        )
+        result = query.get()
+        users = result['data']['users']
+        self.assertEqual(users[self.users[2].pk]['group_count'], 3)
+
+    def test_invalid(self):
+        for group in (
+            {'count': 'id'},
+            {'total': {'median': 'id'}},
+            {'total': {'count': 'missing'}},
+            {'id': {'count': 'groups.id'}},
+        ):
+            with self.assertRaises(QueryValidationError):
+                self.query.take('id').group(group).get()
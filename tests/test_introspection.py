@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.test import SimpleTestCase
+
+from django_resource.introspection import get_model_schema
+from django_resource.store import DjangoSchemaResolver
+
+from .test_executor import make_space
+
+
+class ModelSchemaTestCase(SimpleTestCase):
+    def test_fields(self):
+        schema = get_model_schema(User)
+        self.assertIs(schema, get_model_schema(User))
+        self.assertIn('username', schema.fields)
+        self.assertNotIn('user_permissions.name', schema.fields)
+
+        username = schema.get('username')
+        self.assertEqual(username['type'], 'string')
+        self.assertTrue(username['unique'])
+        self.assertTrue(username['description'])
+        self.assertEqual(
+            schema.get('groups')['type'], {'type': 'array', 'items': 'number'}
+        )
+        self.assertEqual(schema.get('missing'), None)
+
+    def test_paths(self):
+        schema = get_model_schema(User)
+        name = schema.get('groups.name')
+        self.assertEqual(name['source'], 'groups.name')
+        self.assertEqual(name['type'], {'type': 'array', 'items': 'string'})
+        # reverse relations by query name
+        self.assertTrue(get_model_schema(Group).get('user')['many'])
+
+        with mock.patch.object(User._meta, 'get_fields') as get_fields:
+            self.assertIs(schema.get('groups.name'), name)
+            get_model_schema(User).get('email')
+        get_fields.assert_not_called()
+
+        # invalid paths are not kept
+        self.assertEqual(schema.get('groups.missing'), None)
+        self.assertNotIn('groups.missing', schema.paths)
+
+
+class DjangoSchemaResolverTestCase(SimpleTestCase):
+    def test_get_schema(self):
+        space = make_space()
+        users = space.resources[0]
+        resolver = DjangoSchemaResolver(users)
+        self.assertEqual(resolver.model, User)
+        self.assertEqual(
+            resolver.get_schema('groups')['type'],
+            {'type': 'array', 'items': '@groups'}
+        )
+        schema = resolver.get_schema('email')
+        self.assertEqual(schema['source'], 'email')
+        self.assertEqual(schema['type'], 'string')
+        self.assertEqual(schema['unique'], False)
@@ -0,0 +1,74 @@
+from django.contrib.auth.models import Group, User
+from django.test import RequestFactory, TestCase
+
+from django_resource.executor import DjangoExecutor
+from django_resource.loader import get_loader
+from django_resource.resource import Resource
+
+from .test_executor import make_space
+
+
+class LoaderTestCase(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f'group{i}') for i in range(3)]
+        self.users = []
+        for i in range(6):
+            user = User.objects.create(username=f'user{i}')
+            user.groups.set(self.groups[: i % 3])
+            self.users.append(user)
+        self.space = make_space()
+        self.executor = self.space.data.executor
+        self.request = RequestFactory().get('/test/users')
+
+    def test_batch(self):
+        loader = get_loader(self.request, self.executor)
+        self.assertIs(get_loader(self.request, self.executor), loader)
+        # one loader per space
+        executor = DjangoExecutor(self.space)
+        self.assertIs(get_loader(self.request, executor), loader)
+
+        pks = [user.pk for user in self.users]
+        groups = loader.load_many('users', 'groups', pks + pks)
+        names = loader.load_many('users', 'username', pks)
+        with self.assertNumQueries(2):
+            values = [value.get() for value in groups]
+            self.assertEqual(names[1].get(), 'user1')
+        self.assertEqual(values[0], [])
+        self.assertEqual(
+            values[2], [self.groups[0].pk, self.groups[1].pk]
+        )
+        self.assertEqual(loader.fetches, 2)
+
+        # memoized for the rest of the request
+        with self.assertNumQueries(0):
+            self.assertEqual(loader.get('users', 'groups', pks[1]), values[1])
+        with self.assertNumQueries(1):
+            self.assertIsNone(loader.get('users', 'username', 0))
+            self.assertIsNone(loader.get('users', 'username', 0))
+
+        other = RequestFactory().get('/test/users')
+        self.assertIsNot(get_loader(other, self.executor), loader)
+
+    def test_lazy_methods(self):
+        accounts = Resource(
+            id='test.accounts',
+            name='accounts',
+            source='auth.user',
+            fields={
+                'id': 'id',
+                'groups': {
+                    'type': {'type': 'array', 'items': '@groups'},
+                    'source': 'groups',
+                    'lazy': {'get.resource': True},
+                },
+            }
+        )
+        self.space.add('resources', [accounts])
+        user = self.users[1]
+
+        result = accounts.data.query.get()
+        self.assertNotIn('accounts.groups', result['data'])
+        result = accounts.data.query.record(user.pk).get()
+        self.assertEqual(
+            result['data']['accounts.groups'], {user.pk: [self.groups[0].pk]}
+        )
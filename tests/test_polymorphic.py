@@ -0,0 +1,138 @@
+import json
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+
+from django_resource.exceptions import QueryExecutionError
+from django_resource.renderer import StreamingRenderer
+from django_resource.resource import Resource
+from django_resource.types import get_links
+
+from .test_executor import make_space
+
+
+class PolymorphicTestCase(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f'group{i}') for i in range(3)]
+        self.users = []
+        for i in range(6):
+            user = User.objects.create(username=f'user{i}')
+            user.groups.set(self.groups[: i % 3])
+            self.users.append(user)
+        self.space = make_space()
+        self.members = Resource(
+            id='test.members',
+            name='members',
+            source='auth.user',
+            fields={
+                'id': 'id',
+                'related': {
+                    'type': {
+                        'type': 'array',
+                        'items': {'anyOf': ['@users', '@groups']}
+                    },
+                    'getter': lambda user: [user] + list(user.groups.all()),
+                    'needs': 'groups',
+                },
+            }
+        )
+        self.space.add('resources', [self.members])
+        self.query = (
+            self.members.data.query
+            .take('id', 'related')
+            .take.related('username', 'name')
+        )
+
+    def test_get_links(self):
+        self.assertEqual(
+            get_links(self.members.get_option('fields')['related']['type']),
+            ['users', 'groups']
+        )
+        self.assertEqual(get_links('@users'), ['users'])
+        self.assertEqual(get_links('string'), [])
+
+    def test_batch(self):
+        # members, their groups, then one query per linked resource
+        with self.assertNumQueries(4):
+            result = self.query.get()
+
+        user = self.users[2]
+        data = result['data']
+        self.assertEqual(
+            data['members'][user.pk]['related'],
+            [
+                f'users/{user.pk}',
+                f'groups/{self.groups[0].pk}',
+                f'groups/{self.groups[1].pk}'
+            ]
+        )
+        self.assertEqual(data['users'][user.pk], {'username': 'user2'})
+        self.assertEqual(len(data['users']), 6)
+        self.assertEqual(
+            data['groups'],
+            {
+                self.groups[0].pk: {'name': 'group0'},
+                self.groups[1].pk: {'name': 'group1'},
+            }
+        )
+
+    def test_ids_only(self):
+        query = self.members.data.query.take('id', 'related')
+        with self.assertNumQueries(2):
+            result = query.get()
+        self.assertEqual(list(result['data'].keys()), ['members'])
+
+    def test_render(self):
+        expected = json.loads(json.dumps(self.query.get()))
+        renderer = StreamingRenderer(self.space.data.executor)
+        response = renderer.get_response(self.query)
+        with self.assertNumQueries(4):
+            content = b''.join(response.streaming_content)
+        self.assertEqual(json.loads(content.decode('utf-8')), expected)
+
+    def test_render_empty_targets(self):
+        # no groups are linked, so no "groups" key is written
+        User.groups.through.objects.all().delete()
+        expected = json.loads(json.dumps(self.query.get()))
+        self.assertNotIn('groups', expected['data'])
+        renderer = StreamingRenderer(self.space.data.executor)
+        content = b''.join(renderer.get_response(self.query).streaming_content)
+        self.assertEqual(json.loads(content.decode('utf-8')), expected)
+
+    def test_invalid_id(self):
+        # bare keys are not "{resource}/{key}" IDs
+        for i, value in enumerate(('1', 1)):
+            resource = Resource(
+                id=f'test.bad{i}',
+                name=f'bad{i}',
+                source='auth.user',
+                fields={
+                    'id': 'id',
+                    'related': {
+                        'type': {'anyOf': ['@users', '@groups']},
+                        'getter': lambda user, value=value: value,
+                    },
+                }
+            )
+            self.space.add('resources', [resource])
+            query = resource.data.query.take('id', 'related').take.related('id')
+            with self.assertRaises(QueryExecutionError):
+                query.get()
+
+    def test_invalid_key(self):
+        resource = Resource(
+            id='test.invalid',
+            name='invalid',
+            source='auth.user',
+            fields={
+                'id': 'id',
+                'related': {
+                    'type': {'anyOf': ['@users', '@groups']},
+                    'getter': lambda user: f'users/{user.pk}x',
+                },
+            }
+        )
+        self.space.add('resources', [resource])
+        query = resource.data.query.take('id', 'related').take.related('id')
+        # no such records
+        self.assertEqual(query.get()['data'].get('users', {}), {})
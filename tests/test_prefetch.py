@@ -0,0 +1,83 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.test import TestCase
+
+from django_resource.exceptions import QueryExecutionError
+from django_resource.prefetch import get_getter_value, plan_prefetch
+from django_resource.renderer import StreamingRenderer
+from django_resource.resource import Resource
+
+from .test_executor import make_space
+
+
+class PrefetchTestCase(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f'group{i}') for i in range(3)]
+        self.users = []
+        for i in range(6):
+            user = User.objects.create(username=f'user{i}')
+            user.groups.set(self.groups[: i % 3 + 1])
+            self.users.append(user)
+        self.space = make_space()
+        self.members = Resource(
+            id='test.members',
+            name='members',
+            source='auth.user',
+            fields={
+                'id': 'id',
+                'mainGroup': {
+                    'type': '@groups',
+                    'getter': 'groups.all.-1',
+                    'needs': ['groups.*'],
+                },
+                'groupCount': {
+                    'type': 'number',
+                    'getter': lambda user: len(user.groups.all()),
+                    'needs': 'groups',
+                },
+            }
+        )
+        self.space.add('resources', [self.members])
+
+    def test_plan(self):
+        self.assertEqual(
+            plan_prefetch(User, ['groups.*', 'groups.name', 'username']),
+            ([], ['groups'])
+        )
+        self.assertEqual(
+            plan_prefetch(Permission, ['content_type.app_label', 'group']),
+            (['content_type'], ['group'])
+        )
+        self.assertEqual(
+            plan_prefetch(User, ['groups.permissions.content_type']),
+            ([], ['groups__permissions__content_type'])
+        )
+        with self.assertRaises(QueryExecutionError):
+            plan_prefetch(User, ['missing.*'])
+        with self.assertRaises(QueryExecutionError):
+            plan_prefetch(User, ['username.groups'])
+
+    def test_getter(self):
+        user = self.users[2]
+        self.assertEqual(get_getter_value(user, 'groups.all.-1'), self.groups[2])
+        self.assertEqual(get_getter_value(user, 'groups.all.5'), None)
+        self.assertEqual(get_getter_value(user, 'username.upper'), 'USER2')
+
+    def test_needs(self):
+        query = self.members.data.query.take('id', 'mainGroup', 'groupCount')
+        # one query for users, one for all of their groups
+        with self.assertNumQueries(2):
+            result = query.get()
+        members = result['data']['members']
+        for i, user in enumerate(self.users):
+            self.assertEqual(
+                members[user.pk],
+                {
+                    'id': user.pk,
+                    'mainGroup': self.groups[i % 3].pk,
+                    'groupCount': i % 3 + 1
+                }
+            )
+
+        response = StreamingRenderer(self.space.data.executor).get_response(query)
+        with self.assertNumQueries(2):
+            b''.join(response.streaming_content)
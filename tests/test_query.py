@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django_resource.cache import LRUCache
+from django_resource.exceptions import QueryValidationError
+from django_resource.query import Query
+
+
+class Executor(object):
+    def __init__(self, max_depth):
+        self.max_depth = max_depth
+
+    def get_feature(self, name):
+        return {'max_depth': self.max_depth}
+
+
+class QueryStateTestCase(SimpleTestCase):
+    def test_update_shares_unchanged_state(self):
+        base = (
+            Query()
+            .take.users('id', 'name')
+            .take.groups('id')
+            .sort('name')
+        )
+        query = base.take.users.groups('id').page(size=10)
+
+        # the original query is unchanged
+        self.assertEqual(
+            base.state,
+            {
+                'take': {
+                    'users': {'take': {'id': True, 'name': True}},
+                    'groups': {'take': {'id': True}},
+                },
+                'sort': ('name',),
+            }
+        )
+        self.assertEqual(
+            query['take']['users']['take'],
+            {'id': True, 'name': True, 'groups': {'take': {'id': True}}}
+        )
+        self.assertEqual(query['page'], {'size': 10})
+        # untouched subtrees are shared, not copied
+        self.assertIs(query['take']['groups'], base['take']['groups'])
+        self.assertIsNot(query['take']['users'], base['take']['users'])
+
+        # in-place updates to the original do not reach the copy
+        base = Query(state={'take': {'users': {'take': {'id': True}}}})
+        query = base.take.groups('id')
+        base._take('users', 'name', copy=False)
+        self.assertEqual(query['take']['users'], {'take': {'id': True}})
+        self.assertEqual(
+            base['take']['users'], {'take': {'id': True, 'name': True}}
+        )
+
+    def test_from_querystring_cache(self):
+        cache = Query.get_cache()
+        cache.clear()
+
+        first = Query.from_querystring('take=id,name&sort=-name&page.size=10')
+        second = Query.from_querystring('page.size=10&sort=-name&take=id,name')
+        self.assertEqual(first.state, second.state)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # cached states are not changed by updates to returned queries,
+        # even in place
+        expected = {
+            'take': {'id': True, 'name': True},
+            'sort': ['-name'],
+            'page': {'size': 10},
+        }
+        second.take('email')
+        second.page(size=20, copy=False)
+        second.inspect(resource=True, copy=False)
+        second._take(None, 'email', copy=False)
+        first._take('groups', 'name', copy=False)
+        self.assertEqual(second['page'], {'size': 20})
+        self.assertEqual(second['take'], {'id': True, 'name': True, 'email': True})
+        self.assertEqual(
+            Query.from_querystring('take=id,name&sort=-name&page.size=10').state,
+            expected
+        )
+        self.assertEqual(cache.hits, 2)
+
+        # as are queries copied from them
+        query = second.take('username')
+        query.page(size=30, copy=False)
+        self.assertEqual(second['page'], {'size': 20})
+
+    def test_from_querystring_depth(self):
+        Query.get_cache().clear()
+        querystring = (
+            'where=a or (b and c)'
+            '&where:name:equals:a=x&where:name:equals:b=y&where:name:equals:c=z'
+        )
+        Query.from_querystring(querystring)
+        Query.from_querystring(querystring, executor=Executor(2))
+        # not served from the states parsed with a higher limit
+        with self.assertRaises(QueryValidationError):
+            Query.from_querystring(querystring, executor=Executor(1))
+
+    def test_from_querystring_unbounded(self):
+        with mock.patch.object(Query, '_cache', LRUCache(None)):
+            Query.from_querystring('take=id')
+            Query.from_querystring('take=id')
+            self.assertEqual(Query.get_cache().hits, 1)
@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+from django_resource.record import Record, get_record_type
+
+
+class RecordTestCase(SimpleTestCase):
+    def test_access(self):
+        User = get_record_type('users', ('id', 'name', 'count'))
+        user = User((1, 'Joe', 3))
+        self.assertIs(User, get_record_type('users', ('id', 'name', 'count')))
+        self.assertEqual(user.name, 'Joe')
+        self.assertEqual(user['count'], 3)
+        self.assertEqual(user.count, 3)
+        self.assertEqual(user.get('email', 'none'), 'none')
+        self.assertEqual(dict(user), {'id': 1, 'name': 'Joe', 'count': 3})
+        with self.assertRaises(AttributeError):
+            user.email
+
+    def test_method_names(self):
+        Tag = get_record_type('tags', ('id', 'items', 'get'))
+        tag = Tag((1, ['posts/1'], 'x'))
+        self.assertEqual(tag.items, ['posts/1'])
+        self.assertEqual(tag.get, 'x')
+        self.assertEqual(
+            dict(Record.items(tag)), {'id': 1, 'items': ['posts/1'], 'get': 'x'}
+        )
+        self.assertEqual(tag, {'id': 1, 'items': ['posts/1'], 'get': 'x'})
+        merged = Tag.merge(tag, get_record_type('tags', ('id', 'name'))((1, 'a')))
+        self.assertEqual(merged.items, ['posts/1'])
+        self.assertEqual(merged['name'], 'a')
+
+    def test_merge(self):
+        a = get_record_type('users', ('id', 'name'))((1, 'Joe'))
+        b = get_record_type('users', ('id', 'email'))((1, 'joe@example.com'))
+        self.assertEqual(
+            a.merge(b), {'id': 1, 'name': 'Joe', 'email': 'joe@example.com'}
+        )
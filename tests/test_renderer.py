@@ -0,0 +1,61 @@
+import json
+
+from django.test import TestCase
+from django.contrib.auth.models import Group, User
+from django_resource.renderer import StreamingRenderer
+
+from .test_executor import make_space
+
+
+def normalize(value):
+    """Round-trip through JSON to compare with a rendered response"""
+    return json.loads(json.dumps(value))
+
+
+class StreamingRendererTestCase(TestCase):
+    def setUp(self):
+        groups = [Group.objects.create(name=f'group{i}') for i in range(3)]
+        for i in range(5):
+            user = User.objects.create(username=f'user{i}')
+            user.groups.set(groups[: i % 3 + 1])
+        self.space = make_space()
+
+    def test_matches_executor(self):
+        query = (
+            self.space.data.query
+            .take.users('id', 'username', 'groups')
+            .take.users.groups('id', 'name')
+            .page(size=3)
+        )
+        executor = self.space.data.executor
+        renderer = StreamingRenderer(executor)
+        expected = normalize(executor.get(query))
+
+        response = renderer.get_response(query)
+        with self.assertNumQueries(2):
+            content = b''.join(response.streaming_content)
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        rendered = json.loads(content.decode('utf-8'))
+        self.assertEqual(rendered, expected)
+        self.assertIn('next', rendered['meta']['page']['users'])
+
+    def test_merges_levels(self):
+        # users are rendered at two levels with different fields
+        query = (
+            self.space.data.query
+            .take.users('id', 'groups')
+            .take.users.groups('id', 'users')
+            .take.users.groups.users('username')
+        )
+        executor = self.space.data.executor
+        expected = normalize(executor.get(query))
+        user = User.objects.get(username='user1')
+        self.assertEqual(
+            expected['data']['users'][str(user.pk)],
+            {'id': user.pk, 'username': 'user1'}
+        )
+
+        response = StreamingRenderer(executor).get_response(query)
+        content = b''.join(response.streaming_content)
+        self.assertEqual(json.loads(content.decode('utf-8')), expected)
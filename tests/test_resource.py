@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase
+from django_resource.resource import Resource
+from django_resource.types import Type
+
+
+class SchemaTableTestCase(SimpleTestCase):
+    def test_per_class(self):
+        table = Type.get_schema_table()
+        self.assertIs(table, Type.get_schema_table())
+        self.assertIsNot(table, Resource.get_schema_table())
+        self.assertEqual(table.id_field, 'name')
+        self.assertEqual(table.links, {'base', 'children', 'server'})
+        self.assertEqual(table.lists, {'children'})
+
+    def test_plain_fields_read_from_options(self):
+        type = Type(name='string', container=False)
+        self.assertEqual(type.name, 'string')
+        self.assertEqual(type.container, False)
+        self.assertEqual(type.get_id(), 'string')
+        # no per-instance field setup for plain reads
+        self.assertEqual(type._fields, {})
+
+        type.container = True
+        self.assertEqual(type.container, True)
@@ -0,0 +1,71 @@
+import json
+
+from django.contrib.auth.models import User
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from .test_executor import make_space
+
+
+class RouterTestCase(TestCase):
+    def setUp(self):
+        self.space = make_space()
+        self.server = self.space.server
+        self.factory = RequestFactory()
+
+    def get(self, path):
+        request = self.factory.get(path)
+        response = self.server.dispatch(request, request.path)
+        content = b''.join(response.streaming_content)
+        return response, json.loads(content.decode('utf-8'))
+
+    def test_resolve(self):
+        router = self.server.router
+        self.assertEqual(
+            router.resolve('/test/users/1/groups/'),
+            (self.space, 'users', '1', 'groups')
+        )
+        self.assertEqual(router.resolve('test'), (self.space, None, None, None))
+        for path in ('', 'missing', 'test/missing', 'test/users/1/groups/x'):
+            with self.assertRaises(Http404):
+                router.resolve(path)
+
+    def test_one_pattern(self):
+        self.assertEqual(len(self.server.urlpatterns), 1)
+
+    def test_dispatch(self):
+        user = User.objects.create(username='joe')
+        response, content = self.get('/test/users?take=id,username')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content['key'], {'users': [user.pk]})
+
+        response, content = self.get(f'/test/users/{user.pk}?take=username')
+        self.assertEqual(content['data']['users'][str(user.pk)]['username'], 'joe')
+
+    def test_invalid_record(self):
+        request = self.factory.get('/test/users/abc')
+        with self.assertRaises(Http404):
+            self.server.dispatch(request, request.path)
+
+    def test_invalid_query(self):
+        request = self.factory.get('/test/users?page.key=invalid')
+        response = self.server.dispatch(request, 'test/users')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_field(self):
+        user = User.objects.create(username='joe')
+        request = self.factory.get(f'/test/users/{user.pk}/username')
+        response = self.server.dispatch(request, request.path)
+        self.assertEqual(response.status_code, 400)
+
+    def test_method_not_allowed(self):
+        request = self.factory.generic('TRACE', '/test/users')
+        response = self.server.dispatch(request, 'test/users')
+        self.assertEqual(response.status_code, 405)
+
+        # not implemented by the executor
+        for method in ('POST', 'DELETE', 'OPTIONS'):
+            request = self.factory.generic(method, '/test/users')
+            response = self.server.dispatch(request, 'test/users')
+            self.assertEqual(response.status_code, 405, method)
+            self.assertEqual(response['Allow'], 'GET')
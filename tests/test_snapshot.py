@@ -0,0 +1,90 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+
+from django_resource.server import Server
+from django_resource.snapshot import compile_snapshot, write_snapshot
+
+from .test_executor import make_space
+
+
+class SnapshotTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'schema.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_compile(self):
+        server = make_space().server
+        snapshot = compile_snapshot(server)
+        fields = snapshot['spaces']['test']['users']['fields']
+        self.assertEqual(fields['username']['type'], 'string')
+        self.assertEqual(
+            fields['groups']['type'], {'type': 'array', 'items': '@groups'}
+        )
+        self.assertEqual(snapshot['routes'], {'test': ['groups', 'users']})
+
+    def test_load(self):
+        write_snapshot(make_space().server, self.path)
+
+        space = make_space()
+        server = space.server
+        # checked without building the meta-graph or introspecting models
+        with mock.patch.object(Server, 'setup') as setup, mock.patch.object(
+            User._meta, 'get_fields'
+        ) as get_fields:
+            self.assertTrue(server.load_snapshot(self.path))
+        setup.assert_not_called()
+        get_fields.assert_not_called()
+        self.assertEqual(
+            server.get_compiled_fields('test', 'users')['id']['source'], 'id'
+        )
+        self.assertEqual(
+            space.data.executor.get_fields(space.resources[0], None),
+            server.get_compiled_fields('test', 'users')
+        )
+
+    def test_mismatch(self):
+        write_snapshot(make_space().server, self.path)
+
+        space = make_space()
+        space.resources[0].get_option('fields')['email'] = 'email'
+        self.assertFalse(space.server.load_snapshot(self.path))
+        self.assertIsNone(space.server.get_compiled_fields('test', 'users'))
+        self.assertFalse(space.server.load_snapshot(f'{self.path}.missing'))
+
+    def test_model_mismatch(self):
+        write_snapshot(make_space().server, self.path)
+
+        # e.g. after a migration
+        server = make_space().server
+        with mock.patch.object(User._meta.get_field('username'), 'null', True):
+            self.assertFalse(server.load_snapshot(self.path))
+        self.assertTrue(server.load_snapshot(self.path))
+
+    def test_router(self):
+        write_snapshot(make_space().server, self.path)
+
+        settings = {'SNAPSHOT': self.path}
+        server = make_space().server
+        with override_settings(DJANGO_RESOURCE=settings), mock.patch.object(
+            Server, 'setup'
+        ) as setup:
+            self.assertEqual(
+                server.router.routes['test'], frozenset(['groups', 'users'])
+            )
+        setup.assert_not_called()
+
+        # built from the code if the snapshot does not match
+        server = make_space().server
+        settings = {'SNAPSHOT': f'{self.path}.missing'}
+        with override_settings(DJANGO_RESOURCE=settings), mock.patch.object(
+            Server, 'setup'
+        ) as setup:
+            self.assertIn('users', server.router.routes['test'])
+        setup.assert_called_once()
@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from django_resource.exceptions import RecordNotFoundError
+
+from .test_executor import make_space
+
+
+class ResolveLinksTestCase(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create(username=f'user{i}') for i in range(20)]
+        self.space = make_space()
+
+    def test_one_query(self):
+        keys = [str(user.pk) for user in reversed(self.users)]
+        with self.assertNumQueries(1):
+            records = self.space.resolve_links('users', keys)
+
+        self.assertEqual(
+            [record['username'] for record in records],
+            [user.username for user in reversed(self.users)]
+        )
+        # resolved records are cached
+        with self.assertNumQueries(0):
+            self.space.resolve_links('users', keys[:5])
+
+    def test_missing(self):
+        keys = [self.users[0].pk, 0, 'abc']
+        with self.assertRaises(RecordNotFoundError):
+            self.space.resolve_links('users', keys)
+        self.assertEqual(
+            self.space.resolve_links('users', keys, throw=False)[1:], [None, None]
+        )
+        with self.assertRaises(RecordNotFoundError):
+            self.space.resolve_record('users', 'abc')
+
+        root = self.space.server.root
+        self.assertEqual(root.resolve_records('spaces', ['.', 'x']), {'.': root})
+
+    def test_invalidate(self):
+        key = str(self.users[0].pk)
+        self.space.resolve_links('users', [key])
+        self.space.invalidate('users', key)
+        with self.assertNumQueries(1):
+            self.space.resolve_links('users', [key])
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.db.models import Case
+from django.db.models.functions import Concat
+from django.test import TestCase
+
+from django_resource.resource import Resource
+from django_resource.translate import translate_source
+
+from .test_executor import make_space
+
+TITLE = {
+    'case': [{
+        'when': {'=': ['is_staff', True]},
+        'then': '"Dr."'
+    }, {
+        'else': '"Mx."'
+    }]
+}
+NAME = {
+    'join': {
+        'items': [TITLE, 'first_name', 'last_name'],
+        'separator': ' '
+    }
+}
+
+
+class TranslateTestCase(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(
+                username='ann', first_name='Ann', last_name='Lee', is_staff=True
+            ),
+            User.objects.create(
+                username='bob', first_name='Bob', last_name='Kay'
+            ),
+        ]
+        self.space = make_space()
+        self.people = Resource(
+            id='test.people',
+            name='people',
+            source='auth.user',
+            fields={
+                'id': 'id',
+                'name': {'source': NAME, 'type': 'string'},
+                'label': {
+                    # not a model field: evaluated in Python
+                    'source': {
+                        'join': {'items': ['first_name', 'USERNAME_FIELD']}
+                    },
+                    'type': 'string'
+                },
+            }
+        )
+        self.space.add('resources', [self.people])
+
+    def test_translate(self):
+        self.assertIsInstance(translate_source(NAME, User), Concat)
+        self.assertIsInstance(translate_source(TITLE, User), Case)
+        for source in (
+            {'format': '{{ .username }}'},
+            {'join': 'groups'},
+            {'join': ['first_name', 'groups.name']},
+            {'case': [{'when': {'=': ['missing', 1]}, 'then': '"x"'}]},
+        ):
+            self.assertIsNone(translate_source(source, User))
+
+    def test_projection(self):
+        query = self.people.data.query.take('name').sort('-name')
+        with self.assertNumQueries(1):
+            result = query.get()
+        self.assertEqual(
+            list(result['data']['people'].values()),
+            [{'name': 'Mx. Bob Kay'}, {'name': 'Dr. Ann Lee'}]
+        )
+
+    def test_where(self):
+        query = self.people.data.query.take('id').where(
+            {'matches': ['name', '"^Dr"']}
+        )
+        self.assertEqual(query.get()['key']['people'], [self.users[0].pk])
+
+    def test_fallback(self):
+        query = self.people.data.query.take('name', 'label').sort('name')
+        result = query.get()
+        self.assertEqual(
+            result['data']['people'][self.users[0].pk],
+            {'name': 'Dr. Ann Lee', 'label': 'Ann username'}
+        )
@@ -0,0 +1,92 @@
+from django.test import SimpleTestCase
+from django_resource.exceptions import TypeValidationError
+from django_resource.resource import Resource
+from django_resource.types import compile_type, validate, validate_records
+
+from .test_executor import make_space
+
+
+class CompileTypeTestCase(SimpleTestCase):
+    def test_union(self):
+        validator = compile_type(['null', 'string'])
+        self.assertTrue(validator(None))
+        self.assertTrue(validator('a'))
+        self.assertFalse(validator(1, throw=False))
+        with self.assertRaises(TypeValidationError):
+            validator(1)
+
+    def test_composite(self):
+        validator = compile_type({
+            'anyOf': [
+                {'type': 'null'},
+                {'type': 'array', 'items': 'string'},
+                {'type': 'object'},
+            ]
+        })
+        for value in (None, [], {}):
+            self.assertTrue(validator(value))
+        self.assertFalse(validator(1, throw=False))
+
+    def test_validate(self):
+        values = (None, 'a', 1, True, [], {})
+        expected = [
+            ('string', [False, True, False, False, False, False]),
+            # booleans are ints in Python
+            ('number', [False, False, True, True, False, False]),
+            ('boolean', [False, False, False, True, False, False]),
+            (['null', 'number'], [True, False, True, True, False, False]),
+            ({'type': 'array', 'items': 'string'}, [False] * 4 + [True, False]),
+            ('object', [False] * 5 + [True]),
+            # links are not checked without a space
+            ('@users', [True] * 6),
+            ({'type': 'string', 'not': {'type': 'string'}}, [False] * 6),
+            (
+                {'oneOf': ['number', 'string']},
+                [False, True, True, True, False, False]
+            ),
+        ]
+        for type, results in expected:
+            self.assertEqual(
+                [validate(type, value, throw=False) for value in values],
+                results,
+                type
+            )
+
+
+class ValidateRecordsTestCase(SimpleTestCase):
+    def test_collects_all_errors(self):
+        types = {'name': 'string', 'age': ['null', 'number']}
+        records = [
+            {'name': 'a', 'age': 1},
+            {'name': 1, 'age': 'x'},
+            {'name': 'b'},
+            {'name': 'c', 'extra': True},
+        ]
+        errors = validate_records(types, records)
+        self.assertEqual(set(errors.keys()), {1, 3})
+        self.assertEqual(set(errors[1].keys()), {'name', 'age'})
+        self.assertEqual(list(errors[3].keys()), ['extra'])
+
+    def test_resource(self):
+        space = make_space()
+        people = Resource(
+            id='test.people',
+            name='people',
+            source='auth.user',
+            fields={
+                'id': 'id',
+                'email': {'source': 'email'},
+                'age': {'type': ['null', 'number'], 'source': 'last_login'},
+            }
+        )
+        space.add('resources', [people])
+        self.assertEqual(
+            people.get_field_types(),
+            {'id': 'number', 'email': 'string', 'age': ['null', 'number']}
+        )
+        errors = people.validate_records([
+            {'id': 1, 'email': 'a@b.c', 'age': None},
+            {'id': 'a', 'age': 'x', 'extra': True},
+        ])
+        self.assertEqual(list(errors.keys()), [1])
+        self.assertEqual(set(errors[1].keys()), {'id', 'age', 'extra'})
@@ -0,0 +1,112 @@
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+
+from django_resource.exceptions import QueryValidationError
+from django_resource.query import Query
+from django_resource.resource import Resource
+
+from .test_executor import make_space
+
+
+class WhereTestCase(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f'group{i}') for i in range(3)]
+        self.users = []
+        for i in range(6):
+            user = User.objects.create(username=f'user{i}')
+            user.groups.set(self.groups[: i % 3 + 1])
+            self.users.append(user)
+        self.space = make_space()
+        self.query = self.space.data.executor.get_resource('users').data.query
+
+    def get(self, where):
+        with self.assertNumQueries(1):
+            result = self.query.take('id').where(where).get()
+        return result['key']['users']
+
+    def test_literals(self):
+        self.assertEqual(
+            self.get({'=': ['username', '"user1"']}), [self.users[1].pk]
+        )
+        self.assertEqual(
+            self.get({'not': {'in': ['username', ['"user0"', "'user1'"]]}}),
+            [user.pk for user in self.users[2:]]
+        )
+        self.assertEqual(
+            self.get({'range': ['id', [self.users[1].pk, self.users[2].pk]]}),
+            [self.users[1].pk, self.users[2].pk]
+        )
+        self.assertEqual(self.get({'null': 'username'}), [])
+        self.assertEqual(
+            self.get({'matches': ['username', '"^user[01]$"']}),
+            [self.users[0].pk, self.users[1].pk]
+        )
+
+    def test_references(self):
+        # unquoted strings name fields
+        self.assertEqual(
+            self.get({'=': ['username', 'username']}),
+            [user.pk for user in self.users]
+        )
+        self.assertEqual(self.get({'!=': ['username', 'username']}), [])
+
+    def test_links(self):
+        group = self.groups[2]
+        expected = [user.pk for user in self.users if user.groups.filter(pk=group.pk)]
+        # no duplicate rows from to-many joins
+        self.assertEqual(self.get({'contains': ['groups', group.pk]}), expected)
+        self.assertEqual(self.get({'=': ['groups.name', '"group2"']}), expected)
+        self.assertEqual(
+            self.get({'!=': ['groups.name', '"group2"']}),
+            [user.pk for user in self.users if user.pk not in expected]
+        )
+
+    def test_dotted_source(self):
+        members = Resource(
+            id='test.members',
+            name='members',
+            source='auth.user',
+            fields={'id': 'id', 'groupName': 'groups.name'}
+        )
+        self.space.add('resources', [members])
+        query = members.data.query.take('id').where(
+            {'matches': ['groupName', '"^group"']}
+        )
+        # one row per user, not per group
+        self.assertEqual(
+            query.get()['key']['members'], [user.pk for user in self.users]
+        )
+
+    def test_boolean(self):
+        self.assertEqual(
+            self.get({'or': [
+                {'=': ['username', '"user0"']},
+                {'and': [
+                    {'contains': ['username', '"5"']},
+                    {'not.null': 'username'},
+                ]},
+            ]}),
+            [self.users[0].pk, self.users[5].pk]
+        )
+
+    def test_querystring(self):
+        query = Query.from_querystring(
+            'take=id&where:username:in=user0&where:username:in=user3',
+            state={'.space': 'test', '.resource': 'users'},
+            executor=self.space.data.executor
+        )
+        self.assertEqual(
+            query.state['where'], [{'in': ['username', ['"user0"', '"user3"']]}]
+        )
+        self.assertEqual(
+            query.get()['key']['users'], [self.users[0].pk, self.users[3].pk]
+        )
+
+    def test_invalid(self):
+        for where in (
+            {'=': ['missing', 1]},
+            {'like': ['username', '"x"']},
+            {'=': ['username']},
+        ):
+            with self.assertRaises(QueryValidationError):
+                self.query.where(where).get()